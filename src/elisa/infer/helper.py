@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from collections.abc import Iterable, Mapping
+from functools import lru_cache
 from typing import TYPE_CHECKING, NamedTuple
 
 import jax
@@ -101,7 +102,8 @@ def check_params(
         info = ', '.join(params_err)
         raise RuntimeError(f'parameters are integrated-out: {info}')
 
-    return sorted(params, key=params_names['all'].index)
+    index = {k: i for i, k in enumerate(params_names['all'])}
+    return sorted(params, key=index.__getitem__)
 
 
 # def get_reparam(dist: Distribution) -> tuple[Reparam, Callable] | None:
@@ -518,6 +520,13 @@ def get_helper(fit: Fit) -> Helper:
         }
         return loglike
 
+    @jax.jit
+    def unconstr_arr_to_params_dic(arr: JAXArray) -> ParamNameValMapping:
+        """Get parameters dict in constrained space,
+        given a free parameters array in unconstrained space.
+        """
+        return get_sites(arr)['params']
+
     @jax.jit
     def unconstr_dic_to_params_dic(
         dic: ParamNameValMapping,
@@ -525,15 +534,14 @@ def get_helper(fit: Fit) -> Helper:
         """Get parameters dict in constrained space,
         given a free parameters dict in unconstrained space.
         """
-        return jax.jit(get_sites)(dic_to_arr(dic))['params']
+        return unconstr_arr_to_params_dic(dic_to_arr(dic))
 
     @jax.jit
     def unconstr_arr_to_params_array(arr: JAXArray) -> JAXArray:
-        """Get parameters dict in constrained space,
+        """Get parameters array in constrained space,
         given a free parameters array in unconstrained space.
         """
-        unconstr_dic = arr_to_dic(arr)
-        params_dic = unconstr_dic_to_params_dic(unconstr_dic)
+        params_dic = unconstr_arr_to_params_dic(arr)
         return jnp.array([params_dic[i] for i in params_names])
 
     @jax.jit
@@ -605,14 +613,11 @@ def get_helper(fit: Fit) -> Helper:
     # =============== functions used in simulation procedure ==================
     lm_solver = optx.LevenbergMarquardt(rtol=0.0, atol=1e-6)
 
-    @jax.jit
-    def fit_once(i: int, args: tuple) -> tuple:
-        """Loop core, fit simulation data once."""
-        sim_data, result, init = args
-
+    def fit_one(sim_data: dict[str, JAXArray], init: JAXArray) -> dict:
+        """Fit one simulation data, given initial unconstrained parameters."""
         # substitute observation data with simulation data
         new_data = {
-            f'{j}_data': sim_data[j][i] for v in data_group.values() for j in v
+            f'{j}_data': sim_data[j] for v in data_group.values() for j in v
         }
         new_residual = jax.jit(handlers.substitute(fn=residual, data=new_data))
         new_deviance = jax.jit(handlers.substitute(fn=deviance, data=new_data))
@@ -622,7 +627,7 @@ def get_helper(fit: Fit) -> Helper:
         res = optx.least_squares(
             fn=lambda p, _: new_residual(p),
             solver=lm_solver,
-            y0=init[i],
+            y0=init,
             max_steps=1024,
             throw=False,
         )
@@ -630,101 +635,92 @@ def get_helper(fit: Fit) -> Helper:
         grad_norm = jnp.linalg.norm(res.state.f_info.compute_grad())
 
         sites = new_sites(fitted_params)
-
-        # update best fit params to result
-        params = sites['params']
-        result['params'] = jax.tree.map(
-            lambda x, y: x.at[i].set(y),
-            result['params'],
-            params,
-        )
-
-        # update the best fit model to result
         models = sites['models']
-        result['models'] = jax.tree.map(
-            lambda x, y: x.at[i].set(y),
-            result['models'],
-            {k: models[k] for k in result['models']},
-        )
-
-        # update the deviance information to result
         dev = new_deviance(fitted_params)
-        res_dev = result['deviance']
-        res_dev['group'] = jax.tree.map(
-            lambda x, y: x.at[i].set(y),
-            res_dev['group'],
-            dev['group'],
-        )
-        res_dev['point'] = jax.tree.map(
-            lambda x, y: x.at[i].set(y),
-            res_dev['point'],
-            dev['point'],
-        )
-        res_dev['total'] = res_dev['total'].at[i].set(dev['total'])
-
         valid = jnp.bitwise_not(
             jnp.isnan(dev['total'])
             | jnp.isnan(grad_norm)
             | jnp.greater(grad_norm, 1e-3)
         )
-        result['valid'] = result['valid'].at[i].set(valid)
+        return {
+            'params': sites['params'],
+            'models': {
+                i: models[i]
+                for k, v in data_group.items()
+                for i in [k, *map('{}_model'.format, v)]
+            },
+            'deviance': {
+                'total': dev['total'],
+                'group': dev['group'],
+                'point': dev['point'],
+            },
+            'valid': valid,
+        }
 
-        return sim_data, result, init
+    def fit_map(sim_data: dict[str, JAXArray], init: JAXArray) -> dict:
+        """Fit simulation data along the leading axis and stack the results.
 
-    def sim_sequence_fit(
-        sim_data: dict[str, JAXArray],
-        result: dict,
-        init: JAXArray,
-        run_str: str,
-        progress: bool,
-        update_rate: int,
-    ):
-        """Fit simulation data in sequence."""
-        n = len(result['valid'])
+        Note that ``lax.map`` is used instead of ``jax.vmap``, since vmapped
+        ``while_loop`` inside the solver would iterate every simulation until
+        the slowest one converges.
+        """
+        return lax.map(lambda args: fit_one(*args), (sim_data, init))
 
-        if progress:
-            pbar_factory = progress_bar_factory(
-                n, 1, run_str=run_str, update_rate=update_rate
-            )
-            fn = pbar_factory(fit_once)
-        else:
-            fn = fit_once
+    def fit_step(i: int, args: tuple) -> dict:
+        """Scan core, fit the i-th simulation data."""
+        return fit_one(*args)
 
-        fit_jit = jax.jit(lambda *args: lax.fori_loop(0, n, fn, args)[1])
-        result = fit_jit(sim_data, result, init)
-        return result
+    def scan_factory(step: Callable[[int, tuple], dict]) -> Callable:
+        """Create a function fitting simulation data with ``lax.scan``."""
 
-    def sim_parallel_fit(
-        sim_data: dict[str, JAXArray],
-        result: dict,
-        init: JAXArray,
-        run_str: str,
+        def fit_scan(sim_data: dict[str, JAXArray], init: JAXArray) -> dict:
+            body = lambda i, args: (i + 1, step(i, args))
+            return lax.scan(body, 0, (sim_data, init))[1]
+
+        return fit_scan
+
+    @lru_cache(maxsize=8)
+    def get_sim_fit(
+        n: int,
+        parallel: bool,
+        n_parallel: int,
         progress: bool,
         update_rate: int,
-        n_parallel: int,
-    ) -> dict:
-        """Fit simulation data in parallel."""
-        n = len(result['valid'])
-        n_parallel = int(n_parallel)
-        batch = n // n_parallel
+        run_str: str,
+    ) -> Callable[[dict[str, JAXArray], JAXArray], dict]:
+        """Get the function to fit simulation data.
 
+        The function is cached, so that fitting simulation data with the same
+        setup again does not trigger recompilation.
+        """
         if progress:
             pbar_factory = progress_bar_factory(
-                n, n_parallel, run_str=run_str, update_rate=update_rate
+                n,
+                n_parallel if parallel else 1,
+                run_str=run_str,
+                update_rate=update_rate,
             )
-            fn = pbar_factory(fit_once)
+            fit_fn = scan_factory(pbar_factory(fit_step))
         else:
-            fn = fit_once
+            fit_fn = fit_map
 
-        fit_pmap = jax.pmap(lambda *args: lax.fori_loop(0, batch, fn, args)[1])
+        if not parallel:
+            return jax.jit(fit_fn)
+
+        fit_pmap = jax.pmap(fit_fn)
         reshape = lambda x: x.reshape((n_parallel, -1) + x.shape[1:])
-        result = fit_pmap(
-            jax.tree.map(reshape, sim_data),
-            jax.tree.map(reshape, result),
-            jax.tree.map(reshape, init),
-        )
 
-        return jax.tree.map(jnp.concatenate, result)
+        def sim_parallel_fit(
+            sim_data: dict[str, JAXArray], init: JAXArray
+        ) -> dict:
+            """Fit simulation data in parallel."""
+            result = fit_pmap(
+                jax.tree.map(reshape, sim_data),
+                jax.tree.map(reshape, init),
+            )
+            return jax.tree.map(jnp.concatenate, result)
+
+        return sim_parallel_fit
 
     def simulate_and_fit(
         seed: int,
@@ -796,43 +792,19 @@ def get_helper(fit: Fit) -> Helper:
         # simulate data
         sim_data = simulate(seed, model_values, n)
 
-        if n > 1:
+        if shapes[0] == ():
             init = jnp.full((n, len(init)), init)
-            nsim = n
-        else:
-            nsim = len(init)
-
-        # fit result container
-        result = {
-            'params': {k: jnp.empty(nsim) for k in params_names},
-            'models': {
-                i: jnp.empty((nsim, ndata[k]))
-                for k, v in data_group.items()
-                for i in [k, *map('{}_model'.format, v)]
-            },
-            'deviance': {
-                'total': jnp.empty(nsim),
-                'group': {k: jnp.empty(nsim) for k in data_group},
-                'point': {k: jnp.empty((nsim, ndata[k])) for k in data_group},
-            },
-            'valid': jnp.full(nsim, True, bool),
-        }
 
         # fit simulation data
-        if parallel:
-            result = sim_parallel_fit(
-                sim_data,
-                result,
-                init,
-                run_str,
-                progress,
-                update_rate,
-                n_parallel,
-            )
-        else:
-            result = sim_sequence_fit(
-                sim_data, result, init, run_str, progress, update_rate
-            )
+        sim_fit = get_sim_fit(
+            len(init),
+            bool(parallel),
+            int(n_parallel),
+            bool(progress),
+            int(update_rate),
+            str(run_str),
+        )
+        result = sim_fit(sim_data, init)
         result['data'] = sim_data
         return result
 
@@ -857,9 +829,7 @@ def get_helper(fit: Fit) -> Helper:
             'interest': interest_names,
             'all': params_names,
         },
-        params_default=unconstr_dic_to_params_dic(
-            dict(zip(free_names, default_unconstr_arr))
-        ),
+        params_default=unconstr_arr_to_params_dic(default_unconstr_arr),
         params_setup=model_info.setup,
         params_latex=pname_to_latex,
         params_unit=pname_to_unit,
@@ -878,6 +848,7 @@ def get_helper(fit: Fit) -> Helper:
         constr_arr_to_unconstr_arr=constr_arr_to_unconstr_arr,
         constr_dic_to_unconstr_arr=constr_dic_to_unconstr_arr,
         unconstr_dic_to_params_dic=unconstr_dic_to_params_dic,
+        unconstr_arr_to_params_dic=unconstr_arr_to_params_dic,
         simulate=simulate,
         simulate_and_fit=simulate_and_fit,
     )
@@ -1015,6 +986,11 @@ class Helper(NamedTuple):
     in unconstrained space.
     """
 
+    unconstr_arr_to_params_dic: Callable[[JAXArray], ParamNameValMapping]
+    """Get parameters dict in constrained space, given a free parameters
+    array in unconstrained space.
+    """
+
     simulate: Callable[[int, dict[str, JAXArray], int], dict[str, JAXArray]]
     """Function to simulate data."""
 
@@ -7,6 +7,7 @@ import gzip
 import lzma
 import warnings
 from abc import ABC, abstractmethod
+from functools import cached_property, lru_cache
 from importlib import metadata
 from typing import TYPE_CHECKING, NamedTuple
 
@@ -48,7 +49,7 @@ if TYPE_CHECKING:
     from elisa.infer.fit import BayesFit
     from elisa.infer.helper import Helper
     from elisa.plot.plotter import Plotter
-    from elisa.util.typing import JAXArray
+    from elisa.util.typing import JAXArray, NumPyArray
 
 ReactiveNestedSampler = ultranest.ReactiveNestedSampler
 Sampler = nautilus.Sampler
@@ -237,7 +238,7 @@ class FitResult(ABC):
         elif cl < 1:
             return cl
         else:
-            return 1.0 - 2.0 * stats.norm.sf(cl)
+            return _sigma_to_cl(float(cl))
 
     def _check_fn(self, fn: dict[str, Callable] | None):
         """Check user provided function."""
@@ -288,8 +289,11 @@ class MLEResult(FitResult):
 
         self._minuit = minuit
 
-        self._mle_unconstr = jnp.array(minuit.values, float)
+        # MLE of free params in unconstrained space, on host and device
+        self._mle_unconstr_np = np.array(minuit.values, float)
+        self._mle_unconstr = jnp.asarray(self._mle_unconstr_np)
         mle, covar = helper.get_mle(self._mle_unconstr)
+        covar = np.asarray(covar)
 
         if np.allclose(covar, covar.T):
             try:
@@ -303,33 +307,50 @@ class MLEResult(FitResult):
         if not pos_def and minuit.covariance is not None:
             covar_unconstr = jnp.array(minuit.covariance, float)
             covar = helper.params_covar(self._mle_unconstr, covar_unconstr)
+            covar = np.asarray(covar)
 
         var2pos = dict(zip(helper.params_names['all'], range(len(mle))))
         self._covar = CovarMatrix(var2pos)
         self._covar[:] = covar
 
-        err = jnp.sqrt(jnp.diagonal(covar))
+        err = np.sqrt(np.diagonal(covar))
 
-        # MLE of model params in constrained space
-        self._mle = dict(zip(helper.params_names['all'], zip(mle, err)))
+        # MLE of model params in constrained space, values are transferred to
+        # host in one go rather than syncing each element
+        mle = np.asarray(mle)
+        self._mle = dict(
+            zip(helper.params_names['all'], zip(mle.tolist(), err.tolist()))
+        )
+        self._mle_values = mle
+        self._mle_errors = err
 
-        # model deviance at MLE
-        self._deviance = jax.jit(helper.deviance)(self._mle_unconstr)
+        # model deviance at MLE, fetched to host in one transfer
+        self._deviance = jax.device_get(
+            jax.jit(helper.deviance)(self._mle_unconstr)
+        )
 
         # model values at MLE
         sites = jax.jit(helper.get_sites)(self._mle_unconstr)
         self._model_values = sites['models']
 
-        # model comparison statistics
-        k = self._helper.nparam
-        n = self._helper.ndata['total']
-        stat = self._deviance['total']
-        self._aic = float(stat + k * 2 * (1 + (k + 1) / (n - k - 1)))
-        self._bic = float(stat + k * np.log(n))
-
         # parametric bootstrap result
         self._boot: BootstrapResult | None = None
 
+        # sorted bootstrapped parameter distribution, used to get quantiles
+        self._boot_sorted: tuple[list[str], np.ndarray] | None = None
+
+        # names of free and composite parameters, used in ci
+        self._free_names = frozenset(helper.params_names['free'])
+        self._composite_names = frozenset(helper.params_names['deterministic'])
+
+        # compiled loss and gradient used in profiling composite parameters
+        self._composite_loss: dict[str, tuple[Callable, Callable]] = {}
+
+        # vectorized transformation of free parameters
+        self._unconstr_arr_to_params_dic = jax.jit(
+            jax.vmap(helper.unconstr_arr_to_params_dic)
+        )
+
     def __repr__(self):
         tabs = self._tabs()
         return (
@@ -363,7 +384,13 @@ class MLEResult(FitResult):
     def _tabs(self):
         params_tab = make_pretty_table(
             ['Parameter', 'MLE', 'Error'],
-            [(k, f'{v[0]:.4g}', f'{v[1]:.4g}') for k, v in self.mle.items()],
+            list(
+                zip(
+                    self._helper.params_names['all'],
+                    np.char.mod('%.4g', self._mle_values),
+                    np.char.mod('%.4g', self._mle_errors),
+                )
+            ),
         )
         stat_type = self._helper.statistic
         deviance = self.deviance
@@ -449,6 +476,8 @@ class MLEResult(FitResult):
             update_rate,
             'Bootstrap',
         )
+        # fetch the result in one transfer, then filter out invalid fits
+        result = jax.device_get(result)
         valid = result.pop('valid')
         result = jax.tree.map(lambda x: x[valid], result)
 
@@ -464,9 +493,10 @@ class MLEResult(FitResult):
                 result['deviance'],
             ),
             n=n,
-            n_valid=np.sum(valid),
+            n_valid=int(np.count_nonzero(valid)),
             seed=seed,
         )
+        self._boot_sorted = None
 
     @property
     def _params_dist(self) -> dict[str, jax.Array] | None:
@@ -477,6 +507,17 @@ class MLEResult(FitResult):
         n = boot.n_valid - boot.n_valid % jax.local_device_count()
         return {k: v[:n] for k, v in boot.params.items()}
 
+    @property
+    def _params_dist_sorted(self) -> tuple[list[str], np.ndarray] | None:
+        """Names and sorted samples of bootstrapped parameter distribution."""
+        if self._boot is None:
+            return None
+        if self._boot_sorted is None:
+            dist = self._params_dist
+            samples = np.stack(jax.device_get(list(dist.values())))
+            self._boot_sorted = (list(dist.keys()), np.sort(samples, axis=1))
+        return self._boot_sorted
+
     def covar(
         self,
         params: str | Sequence[str] | None = None,
@@ -629,10 +670,8 @@ class MLEResult(FitResult):
         cl = self._to_unit_cl(cl)
         params = check_params(params, self._helper)
         params_set = set(params)
-        free = params_set.intersection(self._helper.params_names['free'])
-        composite = params_set.intersection(
-            self._helper.params_names['deterministic']
-        )
+        free = params_set & self._free_names
+        composite = params_set & self._composite_names
         assert free | composite == params_set
 
         fn = self._check_fn(fn)
@@ -662,7 +701,9 @@ class MLEResult(FitResult):
                         return _
 
                     fn_composite = {k: factory(k) for k in composite}
-                    res2 = self._ci_fn(fn_composite, cl, rtol)
+                    res2 = self._ci_fn(
+                        fn_composite, cl, rtol, self._get_composite_loss()
+                    )
                 else:
                     res2 = ({}, {})
 
@@ -679,7 +720,7 @@ class MLEResult(FitResult):
 
         params_mle = {k: v[0] for k, v in self._mle.items()}
         vars_names = params + list(fn.keys())
-        vars_mle = {k: v for k, v in params_mle.items() if k in vars_names}
+        vars_mle = {k: params_mle[k] for k in params}
         vars_mle |= {k: v(params_mle) for k, v in fn.items()}
         errors = {
             k: (intervals[k][0] - vars_mle[k], intervals[k][1] - vars_mle[k])
@@ -690,7 +731,7 @@ class MLEResult(FitResult):
             mle=_format_result(vars_mle, vars_names),
             intervals=_format_result(intervals, vars_names),
             errors=_format_result(errors, vars_names),
-            cl=1.0 - 2.0 * stats.norm.sf(cl) if cl >= 1.0 else cl,
+            cl=cl,
             method=method,
             status=status,
         )
@@ -712,23 +753,20 @@ class MLEResult(FitResult):
     def _ci_free(self, names: Iterable[str], cl: float | int):
         """Confidence interval of free parameters."""
         self._minuit.minos(*names, cl=cl)
-        mle_unconstr = self._minuit.values.to_dict()
         ci_unconstr = self._minuit.merrors
 
-        # values of uninterested free parameters, in unconstrained space
-        others = {k: v for k, v in mle_unconstr.items() if k not in names}
+        # lower and upper bounds in unconstrained space, the uninterested
+        # free parameters are fixed at MLE
+        bounds = np.tile(np.array(self._minuit.values, float), (2, 1))
+        for k in names:
+            merror = ci_unconstr[k]
+            bounds[0, merror.number] += merror.lower
+            bounds[1, merror.number] += merror.upper
 
-        # lower bound
-        lower = self._helper.unconstr_dic_to_params_dic(
-            {k: mle_unconstr[k] + ci_unconstr[k].lower for k in names} | others
-        )
+        # transform both bounds into constrained space in one call
+        bounds = jax.device_get(self._unconstr_arr_to_params_dic(bounds))
 
-        # upper bound
-        upper = self._helper.unconstr_dic_to_params_dic(
-            {k: mle_unconstr[k] + ci_unconstr[k].upper for k in names} | others
-        )
-
-        interval = {k: (lower[k], upper[k]) for k in names}
+        interval = {k: tuple(bounds[k].tolist()) for k in names}
         status = {
             k: {
                 'valid': (v.lower_valid, v.upper_valid),
@@ -746,16 +784,26 @@ class MLEResult(FitResult):
         fn: dict[str, Callable],
         cl: float | int,
         rtol: dict[str, float],
+        cache: dict[str, tuple[Callable, Callable]] | None = None,
     ):
         """Confidence intervals of function of free parameters."""
         params_mle = {k: v[0] for k, v in self._mle.items()}
         fn_mle = {k: v(params_mle) for k, v in fn.items()}
 
-        def get_minuit(name, mle, r) -> Minuit:
-            loss = self._loss_factory(fn[name], r)
-            grad = jax.jit(jax.grad(loss))
-            init = np.hstack([mle, self._minuit.values])
-            minuit = Minuit(loss, init, grad=grad)
+        # compiled loss and gradient are reused across different rtol
+        if cache is None:
+            cache = {}
+
+        def get_minuit(name, mle, r, init=None) -> Minuit:
+            if name not in cache:
+                cache[name] = self._loss_factory(fn[name])
+            loss, grad = cache[name]
+            r = float(r)
+            if init is None:
+                init = np.hstack([mle, self._mle_unconstr_np])
+            minuit = Minuit(
+                lambda x: loss(x, r), init, grad=lambda x: grad(x, r)
+            )
             minuit.strategy = 2
             minuit.migrad()
             return minuit
@@ -772,10 +820,13 @@ class MLEResult(FitResult):
                 rel_err = np.sqrt(fn_var) / np.abs(mle)
                 rtol_max = np.min([0.01, 0.01 * rel_err, 100 * rtol_desired])
                 if rtol_desired < rtol_max:
+                    # warm start from the previous fit to save evaluations
+                    init = np.array(minuit0.values)
                     for r in np.geomspace(rtol_desired, rtol_max, num=15)[1:]:
-                        minuit = get_minuit(name, mle, r)
+                        minuit = get_minuit(name, mle, r, init)
                         if minuit.accurate:
                             return minuit
+                        init = np.array(minuit.values)
             return minuit0
 
         interval = {}
@@ -794,15 +845,41 @@ class MLEResult(FitResult):
 
         return interval, status
 
-    def _loss_factory(self, fn: Callable, rtol: float):
+    def _get_composite_loss(self) -> dict[str, tuple[Callable, Callable]]:
+        """Get loss and gradient used in profiling composite parameters.
+
+        All composite parameters share a single compiled loss, in which the
+        composite parameter is selected by a traced index.
+        """
+        if not self._composite_loss:
+            names = self._helper.params_names['deterministic']
+            loss, grad = self._loss_factory(
+                lambda p, i: jnp.stack([p[k] for k in names])[i]
+            )
+            for i, k in enumerate(names):
+                self._composite_loss[k] = (
+                    lambda x, r, i=i: loss(x, r, i),
+                    lambda x, r, i=i: grad(x, r, i),
+                )
+        return self._composite_loss
+
+    def _loss_factory(self, fn: Callable) -> tuple[Callable, Callable]:
         """Factory method to create joint loss of params and func of params.
 
         Parameters
         ----------
         fn : Callable
             Function accepts model parameters and outputs a single value.
-        rtol : float
-            Relative tolerance of the function value.
+            Extra arguments of the loss are passed to `fn`.
+
+        Returns
+        -------
+        loss : Callable
+            The jitted joint loss, which accepts the joint parameters array,
+            the relative tolerance of the function value, and extra arguments
+            of `fn`.
+        grad : Callable
+            The jitted gradient of `loss` with respect to the joint parameters.
 
         References
         ----------
@@ -810,19 +887,16 @@ class MLEResult(FitResult):
         .. [2] https://github.com/vemomoto/vemomoto/blob/master/ci_rvm/ci_rvm/ci_rvm.py#L1455
         """
         helper = self._helper
-        params_free = helper.params_names['free']
 
-        @jax.jit
-        def loss(x: np.ndarray):
+        def loss(x: np.ndarray, rtol: float, *args):
             """Joint loss of params and func of params."""
-            unconstr_dic = dict(zip(params_free, x[1:]))
-            params = helper.unconstr_dic_to_params_dic(unconstr_dic)
-            fn_value = fn(params)
+            params = helper.unconstr_arr_to_params_dic(x[1:])
+            fn_value = fn(params, *args)
             s1 = fn_value / x[0] - 1.0
             s2 = (s1 * s1) / rtol
             return helper.deviance_total(x[1:]) + s2
 
-        return loss
+        return jax.jit(loss), jax.jit(jax.grad(loss))
 
     def _ci_boot(
         self,
@@ -846,11 +920,9 @@ class MLEResult(FitResult):
         cl = self._to_unit_cl(cl)
         q = (0.5 - 0.5 * cl, 0.5 + 0.5 * cl)
 
-        interval = {
-            k: np.quantile(v, q=q).tolist()
-            for k, v in boot_params.items()
-            if k in params
-        }
+        names, samples = self._params_dist_sorted
+        quantiles = dict(zip(names, _sorted_quantile(samples, q).tolist()))
+        interval = {k: quantiles[k] for k in params}
         status = {
             'nboot': nboot,
             'seed': int(boot.seed),
@@ -889,9 +961,10 @@ class MLEResult(FitResult):
             fn_values = jax.device_get(eval_fn(boot_params | params_setting))
             status['dist'] |= fn_values
 
-            interval |= {
-                k: np.quantile(v, q).tolist() for k, v in fn_values.items()
-            }
+            # samples is a new array, so it can be partitioned in place
+            samples = np.stack(list(fn_values.values()))
+            quantiles = _partition_quantile(samples, q).tolist()
+            interval |= dict(zip(fn_values.keys(), quantiles))
 
         return interval, status
 
@@ -1294,15 +1367,21 @@ class MLEResult(FitResult):
         stat = {i: float(stat[i]) for i in (*self._helper.data_names, 'total')}
         return stat
 
-    @property
+    @cached_property
     def aic(self) -> float:
         """Akaike information criterion with sample size correction."""
-        return self._aic
+        k = self._helper.nparam
+        n = self._helper.ndata['total']
+        stat = self._deviance['total']
+        return float(stat + k * 2 * (1 + (k + 1) / (n - k - 1)))
 
-    @property
+    @cached_property
     def bic(self) -> float:
         """Bayesian information criterion."""
-        return self._bic
+        k = self._helper.nparam
+        n = self._helper.ndata['total']
+        stat = self._deviance['total']
+        return float(stat + k * np.log(n))
 
     @property
     def status(self) -> FMin:
@@ -1591,11 +1670,12 @@ class PosteriorResult(FitResult):
         fn = self._check_fn(fn)
         params = check_params(params, self._helper)
 
+        # select the parameters first, rather than filter the statistics of
+        # all posterior variables
+        posterior = self.idata['posterior'][params]
         if hdi:
-            median = self.idata['posterior'].median()
-            median = {
-                k: float(v) for k, v in median.data_vars.items() if k in params
-            }
+            median = posterior.median()
+            median = {k: float(v) for k, v in median.data_vars.items()}
             interval = az.hdi(self.idata, cl, var_names=params)
             interval = {
                 k: (float(v[0]), float(v[1]))
@@ -1603,19 +1683,14 @@ class PosteriorResult(FitResult):
             }
         else:
             q = [0.5, 0.5 - cl / 2.0, 0.5 + cl / 2.0]
-            quantile = self.idata['posterior'].quantile(q)
-            quantile = {
-                k: v for k, v in quantile.data_vars.items() if k in params
-            }
+            quantile = posterior.quantile(q)
+            quantile = dict(quantile.data_vars.items())
             median = {k: float(v[0]) for k, v in quantile.items()}
             interval = {
                 k: (float(v[1]), float(v[2])) for k, v in quantile.items()
             }
 
-        dist = {
-            k: v.data
-            for k, v in self.idata['posterior'][params].data_vars.items()
-        }
+        dist = {k: v.data for k, v in posterior.data_vars.items()}
 
         if fn:
             median_, interval_, dist_ = self._ci_fn(fn, cl, hdi, parallel)
@@ -2065,6 +2140,8 @@ class PosteriorResult(FitResult):
             update_rate,
             'PPC',
         )
+        # fetch the result in one transfer, then filter out invalid fits
+        result = jax.device_get(result)
         valid = result.pop('valid')
         result = jax.tree.map(lambda x: x[valid], result)
 
@@ -2081,7 +2158,7 @@ class PosteriorResult(FitResult):
                 result['deviance'],
             ),
             n=n,
-            n_valid=np.sum(valid),
+            n_valid=int(np.count_nonzero(valid)),
             seed=seed,
         )
 
@@ -2476,7 +2553,9 @@ class PosteriorResult(FitResult):
             self._psislw_ = log_weights
         return self._psislw_
 
-    def _loo_expectation(self, values: DataArray, data: str) -> DataArray:
+    def _loo_expectation(
+        self, values: DataArray | NumPyArray, data: str
+    ) -> DataArray:
         """Computes weighted expectations using the PSIS weights.
 
         Notes
@@ -2487,8 +2566,9 @@ class PosteriorResult(FitResult):
 
         Parameters
         ----------
-        values : DataArray
-            Values to compute the expectation.
+        values : DataArray or ndarray
+            Values to compute the expectation. A plain array is of shape
+            (n_sample, n_channel), with chains and draws merged in order.
         data : str
             The data name.
 
@@ -2501,6 +2581,9 @@ class PosteriorResult(FitResult):
         channel = self._helper.channels[f'{data}_channel']
         log_weights = self._psislw.sel(channel=channel)
         log_weights = log_weights.rename({'channel': f'{data}_channel'})
+        if isinstance(values, np.ndarray):
+            # label the array with the (channel, __sample__) dims of weights
+            values = log_weights.copy(data=np.transpose(values))
         log_expectation = log_weights + np.log(np.abs(values))
         weighted = np.sign(values) * np.exp(log_expectation)
         return weighted.sum(dim='__sample__')
@@ -2894,7 +2977,38 @@ class PPCResult(NamedTuple):
     """Seed of random number generator used in simulation."""
 
 
+@lru_cache(maxsize=16)
+def _sigma_to_cl(sigma: float) -> float:
+    """Convert the number of standard deviations into confidence level."""
+    return float(1.0 - 2.0 * stats.norm.sf(sigma))
+
+
+def _sorted_quantile(x: np.ndarray, q: Sequence[float]) -> np.ndarray:
+    """Quantiles of samples sorted along the last axis, as the linear method
+    of np.quantile.
+    """
+    n = x.shape[-1]
+    h = (n - 1) * np.asarray(q, float)
+    lower = np.floor(h).astype(int)
+    upper = np.minimum(lower + 1, n - 1)
+    x_lower = x[..., lower]
+    return x_lower + (h - lower) * (x[..., upper] - x_lower)
+
+
+def _partition_quantile(x: np.ndarray, q: Sequence[float]) -> np.ndarray:
+    """Quantiles along the last axis, as the linear method of np.quantile.
+
+    Note that `x` is partially sorted in place.
+    """
+    n = x.shape[-1]
+    lower = np.floor((n - 1) * np.asarray(q, float)).astype(int)
+    x.partition(np.union1d(lower, np.minimum(lower + 1, n - 1)), axis=-1)
+    return _sorted_quantile(x, q)
+
+
 def _format_result(result: dict, order: Sequence[str]) -> dict:
     """Sort the result and use float type."""
-    formatted = jax.tree.map(float, result)
-    return {k: formatted[k] for k in order}
+    # flatten to a list so that values are transferred to host in one batch
+    leaves, treedef = jax.tree.flatten([result[k] for k in order])
+    leaves = np.asarray(jax.device_get(leaves), float).tolist()
+    return dict(zip(order, jax.tree.unflatten(treedef, leaves)))
@@ -3,16 +3,17 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from functools import cache, wraps
+from functools import cache, cached_property, lru_cache, wraps
+from inspect import signature
 from typing import TYPE_CHECKING
 
 import jax
 import jax.numpy as jnp
 import numpy as np
-import scipy.stats as stats
 from jax.experimental.mesh_utils import create_device_mesh
 from jax.experimental.shard_map import shard_map
 from jax.sharding import Mesh, PartitionSpec
+from scipy.special import ndtr, ndtri
 
 from elisa.infer.likelihood import (
     _STATISTIC_BACK_NORMAL,
@@ -44,8 +45,15 @@ if TYPE_CHECKING:
 
 
 def _cache_method(bound_method: Callable) -> Callable:
-    """Cache instance method."""
-    return cache(bound_method)
+    """Cache instance method.
+
+    Methods with arguments keep only the recently used results, since e.g.
+    a plot usually evaluates a few credible levels repeatedly.
+    """
+    if signature(bound_method).parameters:
+        return lru_cache(maxsize=8)(bound_method)
+    else:
+        return cache(bound_method)
 
 
 def _cache_method_with_check(
@@ -53,51 +61,142 @@ def _cache_method_with_check(
 ) -> Callable:
     """Cache instance method with computation dependency check."""
 
+    check_fields = tuple(check_fields)
+
     def get_id():
-        return {field: id(getattr(instance, field)) for field in check_fields}
+        return tuple(id(getattr(instance, field)) for field in check_fields)
 
-    cached_method = cache(bound_method)
+    cached_method = _cache_method(bound_method)
     old_id = get_id()
 
     @wraps(bound_method)
     def _(*args, **kwargs):
+        nonlocal old_id
         if (new_id := get_id()) != old_id:
             cached_method.cache_clear()
-            old_id.update(new_id)
+            old_id = new_id
         return cached_method(*args, **kwargs)
 
     return _
 
 
-def _get_cached_method_decorator(storage: list):
-    def decorator(method: Callable):
-        storage.append(method.__name__)
-        return method
+class _CachedMethod:
+    """Descriptor of instance method with cache.
 
-    return decorator
+    The cached bound method is created on first access and stored in the
+    instance's ``__dict__``, so that subsequent lookups are plain attribute
+    reads and no cache is created for methods never used.
+    """
 
+    def __init__(
+        self, method: Callable, check_fields: Sequence[str] | None = None
+    ):
+        self.method = method
+        self.check_fields = check_fields
+        self.name = method.__name__
+        self.__doc__ = method.__doc__
 
-def _get_cached_method_with_check_decorator(
-    storage: list, check_fields: str | Sequence[str]
-):
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type | None = None):
+        if instance is None:
+            return self
+
+        bound_method = self.method.__get__(instance, owner)
+        if self.check_fields is None:
+            cached_method = _cache_method(bound_method)
+        else:
+            cached_method = _cache_method_with_check(
+                instance, bound_method, self.check_fields
+            )
+        instance.__dict__[self.name] = cached_method
+        return cached_method
+
+
+def _to_cached_method(method: Callable) -> _CachedMethod:
+    return _CachedMethod(method)
+
+
+def _to_cached_method_with_check(
+    check_fields: str | Sequence[str],
+) -> Callable[[Callable], _CachedMethod]:
     if isinstance(check_fields, str):
-        check_fields = [check_fields]
+        check_fields = (check_fields,)
     else:
-        check_fields = list(check_fields)
+        check_fields = tuple(check_fields)
 
-    def decorator(method: Callable):
-        name = method.__name__
-        storage.append((name, check_fields))
-        return method
+    def decorator(method: Callable) -> _CachedMethod:
+        return _CachedMethod(method, check_fields)
 
     return decorator
 
 
+def _quantile(
+    x: Array, q: float | Array, overwrite: bool = False
+) -> NumPyArray:
+    """Quantiles along the first axis, as the linear method of np.quantile.
+
+    The order statistics are selected by partition rather than a full sort.
+    If `overwrite` is True, `x` is partially sorted in place.
+    """
+    q = np.asarray(q, float)
+    n = len(x)
+
+    # degenerate samples, e.g. when all simulations converge to the same
+    # values, the first and last rows are checked before the full scan; an
+    # infinite sample is left to the interpolation below, which gives NaN
+    if (
+        n >= 32
+        and np.array_equal(x[0], x[-1])
+        and np.all(np.isfinite(x[0]))
+        and np.all(x == x[0])
+    ):
+        return np.broadcast_to(x[0], q.shape + np.shape(x)[1:]).astype(float)
+
+    x = np.asarray(x, float) if overwrite else np.array(x, float)
+    h = (n - 1) * q
+    lower = np.floor(h).astype(int)
+    upper = np.minimum(lower + 1, n - 1)
+    # NaN is partitioned to the last row, which is then checked to propagate
+    # NaN as np.quantile does
+    x.partition(np.union1d(lower, np.append(upper, n - 1)), axis=0)
+    h = np.reshape(h - lower, q.shape + (1,) * (x.ndim - 1))
+    x_lower = x[lower]
+    quantile = x_lower + h * (x[upper] - x_lower)
+    nan = np.isnan(x[-1])
+    if np.any(nan):
+        quantile = np.where(nan, np.nan, quantile)
+    return quantile
+
+
+def _ci_q(cl: float | tuple[float, ...]) -> NumPyArray:
+    """Lower and upper quantiles of central intervals, of shape (..., 2)."""
+    cl = np.asarray(cl, float)
+    assert np.all(0.0 < cl) and np.all(cl < 1.0)
+    return 0.5 + cl[..., None] * np.array([-0.5, 0.5])
+
+
+def _sign(data: Array, model: Array) -> NumPyArray:
+    """Sign of data minus model, a zero difference is taken as positive."""
+    diff = np.subtract(data, model, dtype=float)
+    # copy the sign bit into 1.0 in place, branchless and no mask
+    return np.copysign(1.0, diff, out=diff)
+
+
+def _random_pit(pit_minus: Array, pit: Array, seed: int) -> Array:
+    """Randomized PIT drawn uniformly between `pit_minus` and `pit`."""
+    if pit_minus is pit:  # continuous case, no randomization needed
+        return pit
+    u = np.random.default_rng(seed).random(np.shape(pit))
+    u *= np.subtract(pit, pit_minus)
+    u += pit_minus
+    return u
+
+
 class PlotData(ABC):
     """Base class for data used in plotting."""
 
-    _cached_method: list[str]
-    _cached_method_with_check: list[tuple[str, list[str]]]
     _unfolded_model_fn: dict[str, Callable]
     _ph_egrid: NumPyArray | None = None
 
@@ -107,14 +206,9 @@ class PlotData(ABC):
         self.seed = seed
         self.data = result._helper.data[self.name]
         self.statistic = result._helper.statistic[self.name]
-
-        for f in self._cached_method:
-            method = getattr(self, f)
-            setattr(self, f, _cache_method(method))
-
-        for f, fields in self._cached_method_with_check:
-            method = getattr(self, f)
-            setattr(self, f, _cache_method_with_check(self, method, fields))
+        self._spec_normal = self.statistic in _STATISTIC_SPEC_NORMAL
+        self._with_back = self.statistic in _STATISTIC_WITH_BACK
+        self._back_normal = self.statistic in _STATISTIC_BACK_NORMAL
 
         model = self.result._helper.model[self.name]
         self._unfolded_model_fn = {
@@ -154,6 +248,15 @@ class PlotData(ABC):
     def channel_errors(self) -> NumPyArray:
         return self.data.channel_errors
 
+    @cached_property
+    def channel_breaks(self) -> NumPyArray:
+        """Index of the first channel of each but the first contiguous run."""
+        emin = self.data.channel_emin
+        emax = self.data.channel_emax
+        idx = np.flatnonzero(emin[1:] != emax[:-1]) + 1
+        idx.setflags(write=False)
+        return idx
+
     @property
     def photon_egrid(self) -> NumPyArray:
         if self._ph_egrid is not None:
@@ -213,8 +316,14 @@ class PlotData(ABC):
         pass
 
     @abstractmethod
-    def ce_model_ci(self, cl: float = 0.683) -> Array | None:
-        """Confidence/Credible intervals of the folded source model."""
+    def ce_model_ci(
+        self, cl: float | tuple[float, ...] = 0.683
+    ) -> Array | None:
+        """Confidence/Credible intervals of the folded source model.
+
+        A tuple of `cl` gives the stacked intervals, of shape
+        (len(cl), 2, nchan), from a single pass over the samples.
+        """
         pass
 
     @property
@@ -225,6 +334,10 @@ class PlotData(ABC):
     def params_dist(self) -> dict[str, Array] | None:
         return self.result._params_dist
 
+    def _get_sign(self, rtype: str) -> Array | None:
+        """Get the sign of given type, without evaluating the other types."""
+        return getattr(self, f'_sign_{rtype}')()
+
     def _unfolded_model(
         self,
         mtype: Literal['ne', 'ene', 'eene'],
@@ -275,6 +388,12 @@ class PlotData(ABC):
         """Residuals between the data and the fitted models."""
         pass
 
+    @property
+    @abstractmethod
+    def has_sim(self) -> bool:
+        """Whether bootstrap/ppc samples of the residuals are available."""
+        pass
+
     @abstractmethod
     def residuals_sim(
         self,
@@ -289,38 +408,38 @@ class PlotData(ABC):
     def residuals_ci(
         self,
         rtype: Literal['rd', 'rp', 'rq'],
-        cl: float,
+        cl: float | tuple[float, ...],
         seed: int | None,
         random_quantile: bool,
         with_sign: bool,
     ) -> Array | None:
-        """Confidence/Credible intervals of the residuals."""
-        pass
-
+        """Confidence/Credible intervals of the residuals.
 
-_cached_method = []
-_cached_method_with_check = []
-_to_cached_method = _get_cached_method_decorator(_cached_method)
-_to_cached_method_with_check = _get_cached_method_with_check_decorator(
-    _cached_method_with_check, 'boot'
-)
+        A tuple of `cl` gives the stacked intervals, of shape
+        (len(cl), 2, nchan), from a single pass over the simulations.
+        """
+        pass
 
 
 class MLEPlotData(PlotData):
     result: MLEResult
-    _cached_method = _cached_method
-    _cached_method_with_check = _cached_method_with_check
 
     @property
     def boot(self) -> BootstrapResult:
         return self.result._boot
 
+    @property
+    def has_sim(self) -> bool:
+        return self.boot is not None
+
     @property
     def params_mle(self) -> dict[str, Array]:
         return {k: v[0] for k, v in self.result._mle.items()}
 
-    def get_model_mle(self, name: str) -> Array:
-        return self.result._model_values[name]
+    @_to_cached_method
+    def get_model_mle(self, name: str) -> NumPyArray:
+        # fetch the device array to host once, instead of per draw
+        return np.asarray(self.result._model_values[name])
 
     def get_model_boot(self, name: str) -> Array | None:
         boot = self.boot
@@ -340,18 +459,14 @@ class MLEPlotData(PlotData):
     def ce_model(self) -> Array:
         return self.get_model_mle(self.name)
 
-    @_to_cached_method_with_check
-    def ce_model_ci(self, cl: float = 0.683) -> Array | None:
+    @_to_cached_method_with_check('boot')
+    def ce_model_ci(
+        self, cl: float | tuple[float, ...] = 0.683
+    ) -> Array | None:
         if self.boot is None:
             return None
 
-        assert 0.0 < cl < 1.0
-        ci = np.quantile(
-            self.get_model_boot(self.name),
-            q=0.5 + cl * np.array([-0.5, 0.5]),
-            axis=0,
-        )
-        return ci
+        return _quantile(self.get_model_boot(self.name), q=_ci_q(cl))
 
     def unfolded_model(
         self,
@@ -398,13 +513,13 @@ class MLEPlotData(PlotData):
 
     @_to_cached_method
     def _sign_mle(self) -> Array:
-        return np.where(self.ce_data >= self.ce_model, 1.0, -1.0)
+        return _sign(self.ce_data, self.ce_model)
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('boot')
     def _sign_boot(self) -> Array | None:
         boot = self.get_model_boot(self.name)
         if boot is not None:
-            boot = np.where(self.get_data_boot(self.name) >= boot, 1.0, -1.0)
+            boot = _sign(self.get_data_boot(self.name), boot)
         return boot
 
     def model(
@@ -416,7 +531,7 @@ class MLEPlotData(PlotData):
         assert on_off in {'on', 'off'}
         assert mtype in {'mle', 'boot'}
 
-        if (on_off == 'off') and (self.statistic not in _STATISTIC_WITH_BACK):
+        if on_off == 'off' and not self._with_back:
             return None
 
         name = f'{self.name}_N{on_off}_model'
@@ -440,23 +555,21 @@ class MLEPlotData(PlotData):
 
     @_to_cached_method
     def pit(self) -> tuple[Array, Array]:
-        stat = self.statistic
-
-        if stat in _STATISTIC_SPEC_NORMAL:
+        if self._spec_normal:
             on_data = self.net_counts
         else:
             on_data = self.spec_counts
         on_model = self.model('on', 'mle')
 
-        if stat in _STATISTIC_SPEC_NORMAL:  # chi2
-            pit = stats.norm.cdf((on_data - on_model) / self.net_errors)
+        if self._spec_normal:  # chi2
+            pit = ndtr((on_data - on_model) / self.net_errors)
             return pit, pit
 
-        if stat in _STATISTIC_WITH_BACK:
+        if self._with_back:
             off_data = self.back_counts
             off_model = self.model('off', 'mle')
 
-            if stat in _STATISTIC_BACK_NORMAL:  # pgstat
+            if self._back_normal:  # pgstat
                 pit = pit_poisson_normal(
                     k=on_data,
                     lam=on_model,
@@ -519,10 +632,11 @@ class MLEPlotData(PlotData):
 
         return r
 
+    @_to_cached_method_with_check('boot')
     def residuals_ci(
         self,
         rtype: Literal['rd', 'rp', 'rq'],
-        cl: float = 0.683,
+        cl: float | tuple[float, ...] = 0.683,
         seed: int | None = None,
         random_quantile: bool = True,
         with_sign: bool = False,
@@ -530,21 +644,24 @@ class MLEPlotData(PlotData):
         if self.boot is None or rtype == 'rq':
             return None
 
-        assert 0 < cl < 1
-
+        q = _ci_q(cl)
         r = self.residuals_sim(rtype, seed, random_quantile)
 
         if with_sign:
-            return np.quantile(r, q=0.5 + cl * np.array([-0.5, 0.5]), axis=0)
+            return _quantile(r, q=q)
         else:
-            q = np.quantile(np.abs(r), q=cl, axis=0)
-            return np.row_stack([-q, q])
+            # |r| is a fresh copy, so it can be partitioned in place
+            q = _quantile(np.abs(r), q=cl, overwrite=True)
+            ci = np.empty((*q.shape[:-1], 2, q.shape[-1]))
+            np.negative(q, out=ci[..., 0, :])
+            ci[..., 1, :] = q
+            return ci
 
     @_to_cached_method
     def deviance_residuals_mle(self) -> Array:
         return self._deviance_residuals('mle')
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('boot')
     def deviance_residuals_boot(self) -> Array | None:
         return self._deviance_residuals('boot')
 
@@ -556,13 +673,14 @@ class MLEPlotData(PlotData):
 
         # NB: if background is present, then this assumes the background is
         #     being profiled out, so that each src & bkg data pair has ~1 dof
-        return self.sign[rtype] * np.sqrt(self.deviance(rtype))
+        r = np.sqrt(np.asarray(self.deviance(rtype), float))
+        return np.multiply(r, self._get_sign(rtype), out=r)
 
     @_to_cached_method
     def pearson_residuals_mle(self) -> Array:
         return self._pearson_residuals('mle')
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('boot')
     def pearson_residuals_boot(self) -> Array | None:
         return self._pearson_residuals('boot')
 
@@ -572,30 +690,28 @@ class MLEPlotData(PlotData):
         if rtype == 'boot' and self.boot is None:
             return None
 
-        stat = self.statistic
-
         if rtype == 'mle':
-            if stat in _STATISTIC_SPEC_NORMAL:
+            if self._spec_normal:
                 on_data = self.net_counts
             else:
                 on_data = self.spec_counts
         else:
             on_data = self.get_data_boot(f'{self.name}_Non')
 
-        if stat in _STATISTIC_SPEC_NORMAL:
+        if self._spec_normal:
             std = self.net_errors
         else:
             std = None
 
         r = pearson_residuals(on_data, self.model('on', rtype), std)
 
-        if stat in _STATISTIC_WITH_BACK:
+        if self._with_back:
             if rtype == 'mle':
                 off_data = self.back_counts
             else:
                 off_data = self.get_data_boot(f'{self.name}_Noff')
 
-            if self.statistic in _STATISTIC_BACK_NORMAL:
+            if self._back_normal:
                 std = self.back_errors
             else:
                 std = None
@@ -604,18 +720,21 @@ class MLEPlotData(PlotData):
 
             # NB: this assumes the background is being profiled out,
             #     so that each src & bkg data pair has ~1 dof
-            r = self.sign[rtype] * np.sqrt(r * r + r_b * r_b)
+            # r is a fresh array, reuse it as the output buffer
+            r = np.hypot(r, r_b, out=r)
+            r = np.multiply(r, self._get_sign(rtype), out=r)
 
         return r
 
+    @_to_cached_method
     def quantile_residuals_mle(
         self, seed: int, random: bool
     ) -> tuple[Array, Array | bool, Array | bool]:
         pit_minus, pit = self.pit()
 
         if random:
-            pit = np.random.default_rng(seed).uniform(pit_minus, pit)
-        r = stats.norm.ppf(pit)
+            pit = _random_pit(pit_minus, pit, seed)
+        r = ndtri(pit)
 
         lower = upper = False
 
@@ -642,41 +761,18 @@ class MLEPlotData(PlotData):
                 )
 
         elif stat in {'pgstat', 'wstat'}:
-            upper_mask = pit == 0.0
-            if np.any(upper_mask):
-                r[upper_mask] = stats.norm.ppf(1.0 / self._nsim)
-                upper = np.full(r.shape, False)
-                upper[upper_mask] = True
-
-            lower_mask = pit == 1.0
-            if np.any(lower_mask):
-                r[lower_mask] = stats.norm.ppf(1.0 - 1.0 / self._nsim)
-                lower = np.full(r.shape, False)
-                lower[lower_mask] = True
+            upper = pit == 0.0
+            lower = pit == 1.0
+            r[upper] = ndtri(1.0 / self._nsim)
+            r[lower] = ndtri(1.0 - 1.0 / self._nsim)
+            upper = upper if upper.any() else False
+            lower = lower if lower.any() else False
 
         return r, lower, upper
 
 
-# clean up helpers
-del (
-    _cached_method,
-    _cached_method_with_check,
-    _to_cached_method,
-    _to_cached_method_with_check,
-)
-
-_cached_method = []
-_cached_method_with_check = []
-_to_cached_method = _get_cached_method_decorator(_cached_method)
-_to_cached_method_with_check = _get_cached_method_with_check_decorator(
-    _cached_method_with_check, 'ppc'
-)
-
-
 class PosteriorPlotData(PlotData):
     result: PosteriorResult
-    _cached_method = _cached_method
-    _cached_method_with_check = _cached_method_with_check
 
     @property
     def params(self) -> dict[str, Array]:
@@ -686,6 +782,10 @@ class PosteriorPlotData(PlotData):
     def ppc(self) -> PPCResult | None:
         return self.result._ppc
 
+    @property
+    def has_sim(self) -> bool:
+        return self.ppc is not None
+
     @_to_cached_method
     def get_model_median(self, name: str) -> Array:
         posterior = self.result.idata['posterior'][name]
@@ -698,10 +798,10 @@ class PosteriorPlotData(PlotData):
         return self.result._loo_expectation(posterior, self.name).values
 
     @_to_cached_method
-    def get_model_posterior(self, name: str) -> DataArray:
-        posterior = self.result.idata['posterior'][name]
-        # return shape (n_samples, n_channel)
-        return posterior.stack(__sample__=('chain', 'draw')).T
+    def get_model_posterior(self, name: str) -> Array:
+        posterior = self.result.idata['posterior'][name].values
+        # return shape (n_samples, n_channel), a view if possible
+        return posterior.reshape(-1, *posterior.shape[2:])
 
     def get_model_ppc(self, name: str) -> Array | None:
         if self.ppc is None:
@@ -721,13 +821,8 @@ class PosteriorPlotData(PlotData):
         return self.get_model_median(self.name)
 
     @_to_cached_method
-    def ce_model_ci(self, cl: float = 0.683) -> Array:
-        assert 0.0 < cl < 1.0
-        return np.quantile(
-            self.get_model_posterior(self.name).values,
-            q=0.5 + cl * np.array([-0.5, 0.5]),
-            axis=0,
-        )
+    def ce_model_ci(self, cl: float | tuple[float, ...] = 0.683) -> Array:
+        return _quantile(self.get_model_posterior(self.name), q=_ci_q(cl))
 
     def unfolded_model(
         self,
@@ -776,33 +871,33 @@ class PosteriorPlotData(PlotData):
     @_to_cached_method
     def _sign_posterior(self) -> Array:
         ce_posterior = self.get_model_posterior(self.name)
-        return np.where(self.ce_data >= ce_posterior, 1.0, -1.0)
+        return _sign(self.ce_data, ce_posterior)
 
     @_to_cached_method
     def _sign_loo(self) -> Array:
         ce_loo = self.get_model_loo(self.name)
-        return np.where(self.ce_data >= ce_loo, 1.0, -1.0)
+        return _sign(self.ce_data, ce_loo)
 
     @_to_cached_method
     def _sign_median(self) -> Array:
         ce_median = self.get_model_median(self.name)
-        return np.where(self.ce_data >= ce_median, 1.0, -1.0)
+        return _sign(self.ce_data, ce_median)
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('ppc')
     def _sign_mle(self) -> Array | None:
         if self.ppc is None:
             return None
 
         ce_mle = self.get_model_mle(self.name)
-        return np.where(self.ce_data >= ce_mle, 1.0, -1.0)
+        return _sign(self.ce_data, ce_mle)
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('ppc')
     def _sign_ppc(self) -> Array | None:
         if self.ppc is None:
             return None
 
         ce_ppc = self.get_model_ppc(self.name)
-        return np.where(self.ppc.data[self.name] >= ce_ppc, 1.0, -1.0)
+        return _sign(self.ppc.data[self.name], ce_ppc)
 
     def model(
         self,
@@ -812,7 +907,7 @@ class PosteriorPlotData(PlotData):
         assert on_off in {'on', 'off'}
         assert mtype in {'posterior', 'loo', 'median', 'mle', 'ppc'}
 
-        if (on_off == 'off') and (self.statistic not in _STATISTIC_WITH_BACK):
+        if on_off == 'off' and not self._with_back:
             return None
 
         name = f'{self.name}_N{on_off}_model'
@@ -824,8 +919,10 @@ class PosteriorPlotData(PlotData):
     ) -> DataArray | None:
         """Median, MLE, and ppc deviance."""
         if rtype == 'posterior':
-            loglike = self.result.idata['log_likelihood'][self.name]
-            return -2.0 * loglike.stack(__sample__=('chain', 'draw')).T
+            loglike = self.result.idata['log_likelihood'][self.name].values
+            # merge chain and draw axes as a view, then scale in one pass
+            loglike = loglike.reshape(-1, *loglike.shape[2:])
+            return np.multiply(loglike, -2.0)
         elif rtype == 'loo':
             loglike = self.result.idata['log_likelihood'][self.name]
             deviance = -2.0 * loglike.stack(__sample__=('chain', 'draw')).T
@@ -880,10 +977,11 @@ class PosteriorPlotData(PlotData):
             raise NotImplementedError(f'{rtype} residual')
         return r
 
+    @_to_cached_method_with_check('ppc')
     def residuals_ci(
         self,
         rtype: Literal['rd', 'rp', 'rq'],
-        cl: float = 0.683,
+        cl: float | tuple[float, ...] = 0.683,
         seed: int | None = None,
         random_quantile: bool = True,
         with_sign: bool = False,
@@ -891,15 +989,18 @@ class PosteriorPlotData(PlotData):
         if self.ppc is None or rtype == 'rq':
             return None
 
-        assert 0 < cl < 1
-
+        q = _ci_q(cl)
         r = self.residuals_sim(rtype, seed, random_quantile)
 
         if with_sign:
-            return np.quantile(r, q=0.5 + cl * np.array([-0.5, 0.5]), axis=0)
+            return _quantile(r, q=q)
         else:
-            q = np.quantile(np.abs(r), q=cl, axis=0)
-            return np.row_stack([-q, q])
+            # |r| is a fresh copy, so it can be partitioned in place
+            q = _quantile(np.abs(r), q=cl, overwrite=True)
+            ci = np.empty((*q.shape[:-1], 2, q.shape[-1]))
+            np.negative(q, out=ci[..., 0, :])
+            ci[..., 1, :] = q
+            return ci
 
     @_to_cached_method
     def deviance_residuals_loo(self) -> Array:
@@ -909,11 +1010,11 @@ class PosteriorPlotData(PlotData):
     def deviance_residuals_median(self) -> Array:
         return np.median(self._deviance_residuals('posterior'), axis=0)
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('ppc')
     def deviance_residuals_mle(self) -> Array:
         return self._deviance_residuals('mle')
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('ppc')
     def deviance_residuals_ppc(self) -> Array | None:
         if self.ppc is None:
             return None
@@ -927,7 +1028,8 @@ class PosteriorPlotData(PlotData):
 
         # NB: if background is present, then this assumes the background is
         #     being profiled out, so that each src & bkg data pair has ~1 dof
-        return self.sign[rtype] * np.sqrt(self.deviance(rtype))
+        r = np.sqrt(np.asarray(self.deviance(rtype), float))
+        return np.multiply(r, self._get_sign(rtype), out=r)
 
     @_to_cached_method
     def pearson_residuals_loo(self) -> Array:
@@ -937,11 +1039,11 @@ class PosteriorPlotData(PlotData):
     def pearson_residuals_median(self) -> Array:
         return np.median(self._pearson_residuals('posterior'), axis=0)
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('ppc')
     def pearson_residuals_mle(self) -> Array:
         return self._pearson_residuals('mle')
 
-    @_to_cached_method_with_check
+    @_to_cached_method_with_check('ppc')
     def pearson_residuals_ppc(self) -> Array | None:
         if self.ppc is None:
             return None
@@ -953,11 +1055,10 @@ class PosteriorPlotData(PlotData):
         if rtype in ['mle', 'ppc'] and self.ppc is None:
             return None
 
-        stat = self.statistic
         mtype = 'posterior' if rtype == 'loo' else rtype
 
         if rtype in {'posterior', 'loo', 'mle'}:
-            if stat in _STATISTIC_SPEC_NORMAL:
+            if self._spec_normal:
                 on_data = self.net_counts
             else:
                 on_data = self.spec_counts
@@ -965,21 +1066,21 @@ class PosteriorPlotData(PlotData):
             on_data = self.ppc.data[f'{self.name}_Non']
         on_model = self.model('on', mtype)
 
-        if stat in _STATISTIC_SPEC_NORMAL:
+        if self._spec_normal:
             std = self.net_errors
         else:
             std = None
 
         r = pearson_residuals(on_data, on_model, std)
 
-        if stat in _STATISTIC_WITH_BACK:
+        if self._with_back:
             if rtype in {'posterior', 'loo', 'mle'}:
                 off_data = self.back_counts
             else:
                 off_data = self.ppc.data[f'{self.name}_Noff']
             off_model = self.model('off', mtype)
 
-            if stat in _STATISTIC_BACK_NORMAL:
+            if self._back_normal:
                 std = self.back_errors
             else:
                 std = None
@@ -988,48 +1089,35 @@ class PosteriorPlotData(PlotData):
 
             # NB: this assumes the background is being profiled out,
             #     so that each src & bkg data pair has ~1 dof
-            r = self.sign[rtype] * np.sqrt(r * r + r_b * r_b)
+            # r is a fresh array, reuse it as the output buffer
+            r = np.hypot(r, r_b, out=r)
+            r = np.multiply(r, self._get_sign(rtype), out=r)
 
         if rtype == 'loo':
             r = self.result._loo_expectation(np.abs(r), self.name)
-            r *= self.sign[rtype]
+            r *= self._get_sign(rtype)
 
         return r
 
+    @_to_cached_method
     def quantile_residuals(
         self, seed: int, random: bool
     ) -> tuple[Array, Array | bool, Array | bool]:
         pit_minus, pit = self.pit()
         if random:
-            pit = np.random.default_rng(seed).uniform(pit_minus, pit)
-        r = stats.norm.ppf(pit)
+            pit = _random_pit(pit_minus, pit, seed)
+        r = ndtri(pit)
 
         # Assume the posterior prediction is nchan * ndraw times
         nchain = len(self.result.idata['posterior']['chain'])
         ndraw = len(self.result.idata['posterior']['draw'])
         nsim = nchain * ndraw
 
-        lower = upper = False
-
-        upper_mask = pit == 0.0
-        if np.any(upper_mask):
-            r[upper_mask] = stats.norm.ppf(1.0 / nsim)
-            upper = np.full(r.shape, False)
-            upper[upper_mask] = True
-
-        lower_mask = pit == 1.0
-        if np.any(lower_mask):
-            r[lower_mask] = stats.norm.ppf(1.0 - 1.0 / nsim)
-            lower = np.full(r.shape, False)
-            lower[lower_mask] = True
+        upper = pit == 0.0
+        lower = pit == 1.0
+        r[upper] = ndtri(1.0 / nsim)
+        r[lower] = ndtri(1.0 - 1.0 / nsim)
+        upper = upper if upper.any() else False
+        lower = lower if lower.any() else False
 
         return r, lower, upper
-
-
-# clean up helpers
-del (
-    _cached_method,
-    _cached_method_with_check,
-    _to_cached_method,
-    _to_cached_method_with_check,
-)
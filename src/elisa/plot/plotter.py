@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 import arviz as az
@@ -29,22 +30,52 @@ if TYPE_CHECKING:
     from elisa.util.typing import Array, NumPyArray
 
 
+def _join_segments(
+    x_left: Array,
+    x_right: Array,
+    *ys: Array,
+    idx: NumPyArray | None = None,
+) -> tuple[NumPyArray, ...]:
+    """Join the step segments of non-contiguous grid into single arrays.
+
+    Each segment is closed by its right edge, and segments are separated by
+    NaN, which breaks the line or fill of a single artist. The breaks `idx`
+    of the grid are computed if not given. All `ys` are joined at once.
+    """
+    x_left = np.asarray(x_left, float)
+    x_right = np.asarray(x_right, float)
+    ys = np.asarray(ys, float)
+
+    if idx is None:
+        # index of the first element of each but the first segment
+        idx = np.flatnonzero(x_left[1:] != x_right[:-1]) + 1
+    pos = np.repeat(idx, 2)
+
+    def join(v, v_end):
+        # segment ends and NaN separators interleaved along the last axis
+        values = np.empty((*v.shape[:-1], len(pos)))
+        values[..., ::2] = v_end[..., idx - 1]
+        values[..., 1::2] = np.nan
+        v = np.insert(v, pos, values, axis=-1)
+        return np.concatenate([v, v_end[..., -1:]], axis=-1)
+
+    return join(x_left, x_right), *join(ys, ys)
+
+
 def _plot_step(
-    ax: Axes, x_left: Array, x_right: Array, y: Array, **step_kwargs
+    ax: Axes,
+    x_left: Array,
+    x_right: Array,
+    y: Array,
+    idx: NumPyArray | None = None,
+    **step_kwargs,
 ) -> None:
     assert len(y) == len(x_left) == len(x_right)
 
     step_kwargs['where'] = 'post'
 
-    mask = x_left[1:] != x_right[:-1]
-    idx = np.insert(np.flatnonzero(mask) + 1, 0, 0)
-    idx = np.append(idx, len(y))
-    for i in range(len(idx) - 1):
-        i_slice = slice(idx[i], idx[i + 1])
-        x_slice = np.append(x_left[i_slice], x_right[i_slice][-1])
-        y_slice = y[i_slice]
-        y_slice = np.append(y_slice, y_slice[-1])
-        ax.step(x_slice, y_slice, **step_kwargs)
+    x, y = _join_segments(x_left, x_right, y, idx=idx)
+    ax.step(x, y, **step_kwargs)
 
 
 def _plot_ribbon(
@@ -52,31 +83,22 @@ def _plot_ribbon(
     x_left: Array,
     x_right: Array,
     y_ribbons: Sequence[Array],
+    idx: NumPyArray | None = None,
     **ribbon_kwargs,
 ) -> None:
-    y_ribbons = list(map(np.asarray, y_ribbons))
-    shape = y_ribbons[0].shape
-    assert len(shape) == 2 and shape[0] == 2
-    assert shape[1] == len(x_left) == len(x_right)
-    assert all(ribbon.shape == shape for ribbon in y_ribbons)
+    y_ribbons = np.asarray(y_ribbons)
+    shape = y_ribbons.shape
+    assert len(shape) == 3 and shape[1] == 2
+    assert shape[2] == len(x_left) == len(x_right)
 
     ribbon_kwargs['step'] = 'post'
 
-    mask = x_left[1:] != x_right[:-1]
-    idx = np.insert(np.flatnonzero(mask) + 1, 0, 0)
-    idx = np.append(idx, shape[1])
-    for i in range(len(idx) - 1):
-        i_slice = slice(idx[i], idx[i + 1])
-        x_slice = np.append(x_left[i_slice], x_right[i_slice][-1])
-
-        for ribbon in y_ribbons:
-            lower = ribbon[0]
-            lower_slice = lower[i_slice]
-            lower_slice = np.append(lower_slice, lower_slice[-1])
-            upper = ribbon[1]
-            upper_slice = upper[i_slice]
-            upper_slice = np.append(upper_slice, upper_slice[-1])
-            ax.fill_between(x_slice, lower_slice, upper_slice, **ribbon_kwargs)
+    # join the segments of all ribbons in one pass, sharing the joined x
+    y = y_ribbons.reshape(-1, shape[2])
+    x, *y = _join_segments(x_left, x_right, *y, idx=idx)
+    where = ~np.isnan(x)
+    for lower, upper in zip(y[::2], y[1::2]):
+        ax.fill_between(x, lower, upper, where=where, **ribbon_kwargs)
 
 
 def _adjust_log_range(
@@ -101,6 +123,36 @@ def _adjust_log_range(
     )
 
 
+@lru_cache(maxsize=16)
+def _normal_q(cl: tuple[float, ...]) -> NumPyArray:
+    """Get the read-only half-widths of the normal central intervals."""
+    q = stats.norm.isf(0.5 * (1.0 - np.array(cl)))
+    q.setflags(write=False)
+    return q
+
+
+@lru_cache(maxsize=64)
+def _qq_envelope(n: int, cl: float) -> tuple[NumPyArray, ...]:
+    """Get the normal theoretical quantiles and their pointwise interval.
+
+    The returned arrays are cached and thus read-only.
+
+    References
+    ----------
+    .. [1] doi:10.1080/00031305.2013.847865
+    """
+    # https://stats.stackexchange.com/a/9007
+    # https://stats.stackexchange.com/a/152834
+    alpha = np.pi / 8  # 3/8 is also ok
+    theor = stats.norm.ppf((np.arange(1, n + 1) - alpha) / (n - 2 * alpha + 1))
+    grid = np.arange(1, n + 1)
+    lower = stats.norm.ppf(stats.beta.ppf(0.5 - cl * 0.5, grid, n + 1 - grid))
+    upper = stats.norm.ppf(stats.beta.ppf(0.5 + cl * 0.5, grid, n + 1 - grid))
+    for i in (theor, lower, upper):
+        i.setflags(write=False)
+    return theor, lower, upper
+
+
 def _get_qq(
     q: NumPyArray,
     detrend: bool,
@@ -113,36 +165,61 @@ def _get_qq(
     ----------
     .. [1] doi:10.1080/00031305.2013.847865
     """
-    # https://stats.stackexchange.com/a/9007
-    # https://stats.stackexchange.com/a/152834
-    alpha = np.pi / 8  # 3/8 is also ok
-    n = len(q)
-    theor = stats.norm.ppf((np.arange(1, n + 1) - alpha) / (n - 2 * alpha + 1))
+    theor, lower, upper = _qq_envelope(len(q), float(cl))
+    line = theor
 
     q = np.sort(q)
     if qsim is not None:
+        # the sort along axis 1 gives the order statistics of each
+        # simulation and is required; the sorted copy is then owned here,
+        # so the quantiles can partition it in place
         line, lower, upper = np.quantile(
             np.sort(qsim, axis=1),
             q=[0.5, 0.5 - 0.5 * cl, 0.5 + 0.5 * cl],
             axis=0,
+            overwrite_input=True,
         )
-    else:
-        line = np.array(theor)
-        grid = np.arange(1, n + 1)
-        lower = stats.beta.ppf(0.5 - cl * 0.5, grid, n + 1 - grid)
-        upper = stats.beta.ppf(0.5 + cl * 0.5, grid, n + 1 - grid)
-        lower = stats.norm.ppf(lower)
-        upper = stats.norm.ppf(upper)
 
     if detrend:
         q -= theor
-        line -= theor
-        lower -= theor
-        upper -= theor
+        line = line - theor
+        lower = lower - theor
+        upper = upper - theor
 
     return theor, q, line, lower, upper
 
 
+@lru_cache(maxsize=64)
+def _pit_envelope(n: int, cl: float) -> tuple[NumPyArray, ...]:
+    """Get the scaled rank and pointwise interval of the PIT ECDF.
+
+    The returned arrays are cached and thus read-only.
+
+    References
+    ----------
+    .. [1] doi:10.1007/s11222-022-10090-6
+    """
+    # See ref [1] for the following
+    scaled_rank = np.linspace(0.0, 1.0, n + 1)
+    # Since binomial is discrete, we need to have lower and upper bounds with
+    # a confidence/credible level >= cl to ensure the nominal coverage,
+    # that is, we require that (cdf <= 0.5 - 0.5 * cl) for lower bound
+    # and (0.5 + 0.5 * cl <= cdf) for upper bound
+    # both bounds are evaluated in one ppf and one cdf call, and the
+    # discreteness correction is applied by adding the boolean masks
+    q = np.array([[0.5 - cl * 0.5], [0.5 + cl * 0.5]])
+    bounds = stats.binom.ppf(q, n, scaled_rank)
+    cdf = stats.binom.cdf(bounds, n, scaled_rank)
+    bounds[0] -= cdf[0] > q[0]
+    bounds[1] += cdf[1] < q[1]
+    bounds /= n
+    lower, upper = np.clip(bounds, 0.0, 1.0, out=bounds)
+
+    for i in (scaled_rank, lower, upper):
+        i.setflags(write=False)
+    return scaled_rank, lower, upper
+
+
 def _get_pit_ecdf(
     pit: NumPyArray,
     cl: float,
@@ -155,31 +232,15 @@ def _get_pit_ecdf(
     .. [1] doi:10.1007/s11222-022-10090-6
     """
     n = len(pit)
-
-    # See ref [1] for the following
-    scaled_rank = np.linspace(0.0, 1.0, n + 1)
-    # Since binomial is discrete, we need to have lower and upper bounds with
-    # a confidence/credible level >= cl to ensure the nominal coverage,
-    # that is, we require that (cdf <= 0.5 - 0.5 * cl) for lower bound
-    # and (0.5 + 0.5 * cl <= cdf) for upper bound
-    lower_q = 0.5 - cl * 0.5
-    lower = stats.binom.ppf(lower_q, n, scaled_rank)
-    mask = stats.binom.cdf(lower, n, scaled_rank) > lower_q
-    lower[mask] -= 1.0
-    lower = np.clip(lower / n, 0.0, 1.0)
-
-    upper_q = 0.5 + cl * 0.5
-    upper = stats.binom.ppf(upper_q, n, scaled_rank)
-    mask = stats.binom.cdf(upper, n, scaled_rank) < upper_q
-    upper[mask] += 1.0
-    upper = np.clip(upper / n, 0.0, 1.0)
+    scaled_rank, lower, upper = _pit_envelope(n, float(cl))
 
     line = scaled_rank
-    pit_ecdf = np.count_nonzero(pit <= scaled_rank[:, None], axis=1) / n
+    # count of pit <= rank by binary search, instead of an (n+1, n) mask
+    pit_ecdf = np.searchsorted(np.sort(pit), scaled_rank, side='right') / n
 
     if detrend:
-        lower -= line
-        upper -= line
+        lower = lower - line
+        upper = upper - line
         pit_ecdf -= line
         line = np.zeros_like(line)
 
@@ -811,21 +872,20 @@ class Plotter(ABC):
                 data.channel_emin,
                 data.channel_emax,
                 data.ce_model,
+                idx=data.channel_breaks,
                 color=color,
                 **step_kwargs,
             )
 
-            quantiles = []
-            for i_cl in cl:
-                if (q := data.ce_model_ci(i_cl)) is not None:
-                    quantiles.append(q)
+            quantiles = data.ce_model_ci(tuple(cl))
 
-            if quantiles:
+            if quantiles is not None:
                 _plot_ribbon(
                     ax,
                     data.channel_emin,
                     data.channel_emax,
                     quantiles,
+                    idx=data.channel_breaks,
                     color=color,
                     **ribbon_kwargs,
                 )
@@ -909,7 +969,10 @@ class Plotter(ABC):
         alpha = config.alpha
         xlog = config.xscale == 'log'
 
-        normal_q = stats.norm.isf(0.5 * (1.0 - cl))
+        normal_q = _normal_q(tuple(cl))
+
+        # quantile residuals come with censoring flags and have no intervals
+        is_rq = rtype == 'rq'
 
         ax.set_ylabel(config._YLABLES[rtype])
 
@@ -919,20 +982,20 @@ class Plotter(ABC):
             x = data.channel_emean if xlog else data.channel_emid
             xerr = data.channel_errors if xlog else 0.5 * data.channel_width
 
-            quantiles = []
-            for i_cl in cl:
-                q = data.residuals_ci(
-                    rtype, i_cl, seed, random_quantile, with_sign
+            if data.has_sim and not is_rq:
+                quantiles = data.residuals_ci(
+                    rtype, tuple(cl), seed, random_quantile, with_sign
                 )
-                if q is not None:
-                    quantiles.append(q)
+            else:
+                quantiles = None
 
-            if quantiles:
+            if quantiles is not None:
                 _plot_ribbon(
                     ax,
                     data.channel_emin,
                     data.channel_emax,
                     quantiles,
+                    idx=data.channel_breaks,
                     color=color,
                     **ribbon_kwargs,
                 )
@@ -946,12 +1009,9 @@ class Plotter(ABC):
                         **ribbon_kwargs,
                     )
 
-            use_mle = True if quantiles else False
-            r = data.residuals(rtype, seed, config.random_quantile, use_mle)
-            if rtype == 'rq':
-                r, lower, upper = r
-            else:
-                lower = upper = False
+            use_mle = quantiles is not None
+            r = data.residuals(rtype, seed, random_quantile, use_mle)
+            r, lower, upper = r if is_rq else (r, False, False)
             ax.errorbar(
                 x=x,
                 y=r,
@@ -970,18 +1030,24 @@ class Plotter(ABC):
             )
 
             if mark_outlier:
-                if quantiles:
+                if quantiles is not None:
                     q = quantiles[-1]
                 else:
                     q = [-normal_q[-1], normal_q[-1]]
                 mask = (r < q[0]) | (r > q[1])
                 ax.scatter(x[mask], r[mask], marker='x', c='r')
 
-        for q in normal_q:
-            ax.axhline(q, ls=':', lw=1, c='gray', zorder=0)
-            ax.axhline(-q, ls=':', lw=1, c='gray', zorder=0)
-
-        ax.axhline(0, ls='--', lw=1, c='gray', zorder=0)
+        # reference lines spanning the axes width, drawn as one collection
+        ax.hlines(
+            np.concatenate([normal_q, -normal_q, [0.0]]),
+            0.0,
+            1.0,
+            transform=ax.get_yaxis_transform(),
+            linestyles=[':'] * (2 * len(normal_q)) + ['--'],
+            lw=1,
+            colors='gray',
+            zorder=0,
+        )
         yabs_max = abs(max(ax.get_ylim(), key=abs))
         ax.set_ylim(ymin=-yabs_max, ymax=yabs_max)
 
@@ -1019,14 +1085,14 @@ class Plotter(ABC):
         if rtype is None:
             rtype = config.residuals
 
-        rsim = {
-            name: data.residuals_sim(rtype, seed, random_quantile)
-            for name, data in self.data.items()
-        }
-        if any(i is None for i in rsim.values()):
-            rsim['total'] = None
+        if rtype != 'rq' and all(i.has_sim for i in self.data.values()):
+            rsim = {
+                name: data.residuals_sim(rtype, seed, random_quantile)
+                for name, data in self.data.items()
+            }
+            rsim['total'] = np.concatenate(tuple(rsim.values()), axis=1)
         else:
-            rsim['total'] = np.hstack(list(rsim.values()))
+            rsim = dict.fromkeys(['total', *self.data])
 
         use_mle = True if rsim['total'] is not None else False
         r = {
@@ -1035,7 +1101,7 @@ class Plotter(ABC):
         }
         if rtype == 'rq':
             r = {k: v[0] for k, v in r.items()}
-        r['total'] = np.hstack(list(r.values()))
+        r['total'] = np.concatenate(tuple(r.values()))
 
         n_subplots = len(self.data)
         if n_subplots == 1:
@@ -1058,8 +1124,8 @@ class Plotter(ABC):
         text_x = 0.5 if detrend else 0.03
 
         axs = [ax1] + axs.ravel().tolist()
-        names = ['total'] + list(self.ndata.keys())
-        colors = ['k'] + get_colors(n_subplots, config.palette)
+        names = ['total', *self.data]
+        colors = ['k'] + list(self.colors.values())
         for ax, name, color in zip(axs, names, colors):
             theor, q, line, lo, up = _get_qq(
                 r[name], detrend, 0.95, rsim[name]
@@ -1100,7 +1166,7 @@ class Plotter(ABC):
         config = self.config
 
         pit = {name: data.pit()[1] for name, data in self.data.items()}
-        pit['total'] = np.hstack(list(pit.values()))
+        pit['total'] = np.concatenate(tuple(pit.values()))
 
         n_subplots = len(self.data)
         if n_subplots == 1:
@@ -1123,8 +1189,8 @@ class Plotter(ABC):
         text_x = 0.97 if detrend else 0.03
 
         axs = [ax1] + axs.ravel().tolist()
-        names = ['total'] + list(self.ndata.keys())
-        colors = ['k'] + get_colors(n_subplots, config.palette)
+        names = ['total', *self.data]
+        colors = ['k'] + list(self.colors.values())
 
         for ax, name, color in zip(axs, names, colors):
             x, y, line, lower, upper = _get_pit_ecdf(pit[name], 0.95, detrend)
@@ -1179,7 +1245,6 @@ class Plotter(ABC):
             raise NotImplementedError
         p_value = p_value['group'] | {'total': p_value['total']}
 
-        config = self.config
         n_subplots = len(self.data)
         if n_subplots == 1:
             ncols = 1
@@ -1197,8 +1262,8 @@ class Plotter(ABC):
         ax1.set_ylabel(r'$P(\mathcal{D} \geq D)$')
 
         axs = [ax1] + axs.ravel().tolist()
-        names = ['total'] + list(self.ndata.keys())
-        colors = ['k'] + get_colors(n_subplots, config.palette)
+        names = ['total', *self.data]
+        colors = ['k'] + list(self.colors.values())
 
         for ax, name, color in zip(axs, names, colors):
             d_obs = dev_obs[name]
@@ -1337,9 +1402,11 @@ class MLEResultPlotter(Plotter):
         keys = jax.random.split(
             jax.random.PRNGKey(helper.seed['resd']), len(helper.data_names)
         )
+        # fetch keys to host at once, then seeds are plain Python ints
+        seeds = np.asarray(keys)[:, 0].tolist()
         data = {
-            name: MLEPlotData(name, result, int(key[0]))
-            for name, key in zip(helper.data_names, keys)
+            name: MLEPlotData(name, result, seed)
+            for name, seed in zip(helper.data_names, seeds)
         }
         return data
 
@@ -1524,9 +1591,11 @@ class PosteriorResultPlotter(Plotter):
         keys = jax.random.split(
             jax.random.PRNGKey(helper.seed['resd']), len(helper.data_names)
         )
+        # fetch keys to host at once, then seeds are plain Python ints
+        seeds = np.asarray(keys)[:, 0].tolist()
         data = {
-            name: PosteriorPlotData(name, result, int(key[0]))
-            for name, key in zip(helper.data_names, keys)
+            name: PosteriorPlotData(name, result, seed)
+            for name, seed in zip(helper.data_names, seeds)
         }
         return data
 
@@ -64,7 +64,9 @@ def pearson_residuals(
     """
     if std is None:
         std = np.sqrt(expected)
-    return (observed - expected) / std
+    r = np.subtract(observed, expected, dtype=float)
+    r /= std
+    return r
 
 
 def pit_poisson(
@@ -2,23 +2,39 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from itertools import cycle
+from typing import TYPE_CHECKING
 
 import numpy as np
 import seaborn as sns
 
 from elisa.util.typing import NumPyArray as NDArray
 
+if TYPE_CHECKING:
+    from typing import Any
 
-def get_colors(
-    n: int, palette: str = 'husl'
-) -> list[tuple[float, float, float]]:
+
+def _get_colors(n: int, palette: Any) -> list[tuple[float, float, float]]:
     if len(colors := sns.color_palette(palette)) >= n:
         return colors[:n]
     else:
         return sns.color_palette(palette, n)
 
 
+_get_colors_cached = lru_cache(maxsize=32)(_get_colors)
+
+
+def get_colors(
+    n: int, palette: Any = 'husl'
+) -> list[tuple[float, float, float]]:
+    try:
+        colors = _get_colors_cached(int(n), palette)
+    except TypeError:  # unhashable palette, e.g. a list of colors
+        colors = _get_colors(int(n), palette)
+    return list(colors)
+
+
 def get_markers(n: int) -> list[str]:
     markers_cycle = cycle(['s', 'o', 'D', '^', 'd', 'p', 'h', 'H', 'D'])
     return [marker for marker, _ in zip(markers_cycle, range(int(n)))]
@@ -4,17 +4,17 @@ from __future__ import annotations
 
 import math
 import re
-from functools import reduce
+from functools import lru_cache
 from threading import Lock
 from typing import TYPE_CHECKING
 
 import jax
 import jax.numpy as jnp
+import numpy as np
 from astropy.units import Unit
 from jax import lax
 from jax.custom_derivatives import SymbolicZero
 from jax.experimental import io_callback
-from jax.flatten_util import ravel_pytree
 from prettytable import PrettyTable
 from tqdm.auto import tqdm
 
@@ -38,6 +38,25 @@ _SUBSCRIPT = dict(
         'ᴀʙᴄᴅᴇғɢʜɪᴊᴋʟᴍɴᴏᴘǫʀsᴛᴜᴠᴡxʏᴢₐᵦ𝒸𝒹ₑ𝒻𝓰ₕᵢⱼₖₗₘₙₒₚᵩᵣₛₜᵤᵥ𝓌ₓᵧ𝓏₀₁₂₃₄₅₆₇₈₉₊₋⸝₌₍₎',
     )
 )
+_SUPERSCRIPT_TABLE = str.maketrans(_SUPERSCRIPT)
+_SUBSCRIPT_TABLE = str.maketrans(_SUBSCRIPT)
+_PRETTY_TABLE_CONFIG = {
+    'align': 'c',
+    'hrules': 1,  # 1 for all, 0 for frame
+    'vrules': 1,
+    'padding_width': 1,
+    'vertical_char': '│',
+    'horizontal_char': '─',
+    'junction_char': '┼',
+    'top_junction_char': '┬',
+    'bottom_junction_char': '┴',
+    'right_junction_char': '┤',
+    'left_junction_char': '├',
+    'top_right_junction_char': '╮',
+    'top_left_junction_char': '╭',
+    'bottom_right_junction_char': '╯',
+    'bottom_left_junction_char': '╰',
+}
 
 
 def add_suffix(
@@ -88,13 +107,6 @@ def add_suffix(
     if len(strings) != len(suffix):
         raise ValueError('length of `strings` and `suffix` must be the same')
 
-    def to_unicode(string: str):
-        """Replace suffix with unicode."""
-        if subscript:
-            return ''.join(f'{_SUBSCRIPT.get(i, i)}' for i in string)
-        else:
-            return ''.join(f'{_SUPERSCRIPT.get(i, i)}' for i in string)
-
     if latex:
         symbol = '_' if subscript else '^'
         rm = r'\mathrm' if mathrm else ''
@@ -103,8 +115,10 @@ def add_suffix(
             for i, j in zip(strings, suffix)
         ]
     elif unicode:
+        table = _SUBSCRIPT_TABLE if subscript else _SUPERSCRIPT_TABLE
         strings = [
-            f'{i}{to_unicode(j)}' if j else i for i, j in zip(strings, suffix)
+            f'{i}{j.translate(table)}' if j else i
+            for i, j in zip(strings, suffix)
         ]
     else:
         symbol = '_' if subscript else '^'
@@ -140,37 +154,34 @@ def build_namespace(
     namespace: dict
         A dict of non-duplicate names and suffixes in original name order.
     """
-    namespace = []
-    names_ = []
-    suffixes_n = []
-    counter = {}
+    if prime:
+        if latex:
 
-    for name in names:
-        names_.append(name)
+            def get_suffix(n: int) -> str:
+                return "'" * (n - 1)
 
-        if name not in namespace:
-            counter[name] = 1
-            namespace.append(name)
         else:
-            counter[name] += 1
-            namespace.append(f'{name}#{counter[name]}')
 
-        suffixes_n.append(counter[name])
+            def get_suffix(n: int) -> str:
+                return '"' * ((n - 1) // 2) + "'" * ((n - 1) % 2)
 
-    if prime:
-        suffixes = [i - 1 for i in suffixes_n]
-        if latex:
-            suffixes = ["'" * n for n in suffixes]
-        else:
-            suffixes = ['"' * (n // 2) + "'" * (n % 2) for n in suffixes]
     else:
         template = '_{%d}' if latex else '_%d'
-        suffixes = [template % n if n > 1 else '' for n in suffixes_n]
 
-    return {
-        'namespace': list(map(''.join, zip(names_, suffixes))),
-        'suffix_num': [str(n) if n > 1 else '' for n in suffixes_n],
-    }
+        def get_suffix(n: int) -> str:
+            return template % n if n > 1 else ''
+
+    namespace = []
+    suffix_num = []
+    counter = {}
+
+    for name in names:
+        n = counter.get(name, 0) + 1
+        counter[name] = n
+        namespace.append(name + get_suffix(n))
+        suffix_num.append(str(n) if n > 1 else '')
+
+    return {'namespace': namespace, 'suffix_num': suffix_num}
 
 
 def define_fdjvp(
@@ -184,6 +195,23 @@ def define_fdjvp(
             f"'{method}'"
         )
 
+    @lru_cache(maxsize=16)
+    def get_setup(treedef, non_zero_tangents: tuple[bool, ...], dtype):
+        """Get the setup depending only on the tangent pattern and dtype."""
+        # the perturbation pattern and step scale are trace-time constants
+        idx = np.flatnonzero(non_zero_tangents)
+        eps = float(jnp.finfo(dtype).eps)
+        if method == 'central':
+            step = eps ** (1.0 / 3.0)
+        else:
+            step = math.sqrt(eps)
+        f_vmap = jax.vmap(
+            lambda e, p: fn(e, jax.tree.unflatten(treedef, list(p))),
+            in_axes=(None, 0),
+            out_axes=0,
+        )
+        return idx, step, f_vmap
+
     def fdjvp(primals, tangents):
         egrid, params = primals
         egrid_tangent, params_tangent = tangents
@@ -199,43 +227,53 @@ def define_fdjvp(
                 'JVP for non-scalar parameter is not implemented'
             )
 
-        non_zero_tangents = [not isinstance(v, SymbolicZero) for v in tvals]
-        idx = [i for i, v in enumerate(non_zero_tangents) if v]
-        idx_arr = jnp.array(idx)
-        nbatch = sum(non_zero_tangents)
-        nparam = len(tvals)
-        params_ravel, revert = ravel_pytree(params)
-        free_params_values = params_ravel[idx_arr]
+        # parameters are all scalars, so the flat vector is just the leaves
+        pvals, treedef = jax.tree.flatten(params)
+        non_zero_tangents = tuple(
+            not isinstance(v, SymbolicZero) for v in tvals
+        )
+        idx, step, f_vmap = get_setup(
+            treedef, non_zero_tangents, jnp.dtype(egrid.dtype)
+        )
+        nbatch = len(idx)
+        nparam = len(non_zero_tangents)
+        params_ravel = jnp.stack(pvals)
+        free_params_values = params_ravel[idx]
         free_params_abs = jnp.where(
             jnp.equal(free_params_values, 0.0),
             jnp.ones_like(free_params_values),
             jnp.abs(free_params_values),
         )
         free_params_abs = jnp.expand_dims(free_params_abs, axis=-1)
-        row_idx = jnp.arange(nbatch)
-        perturb_idx = jnp.zeros((nbatch, nparam)).at[row_idx, idx_arr].set(1.0)
-        params_batch = jnp.full((nbatch, nparam), params_ravel)
 
-        eps = jnp.finfo(egrid.dtype).eps
-        f_vmap = jax.vmap(fn, in_axes=(None, 0), out_axes=0)
-        revert = jax.vmap(revert, in_axes=0, out_axes=0)
+        free_params_tangent = jnp.stack(
+            [v for v, nz in zip(tvals, non_zero_tangents) if nz]
+        )
 
         # See Numerical Recipes Chapter 5.7
+        perturb = free_params_abs * step
         if method == 'central':
-            perturb = free_params_abs * eps ** (1.0 / 3.0)
-            params_pos_perturb = revert(params_batch + perturb_idx * perturb)
-            out_pos_perturb = f_vmap(egrid, params_pos_perturb)
-            params_neg_perturb = revert(params_batch - perturb_idx * perturb)
-            out_neg_perturb = f_vmap(egrid, params_neg_perturb)
-            d_out = (out_pos_perturb - out_neg_perturb) / (2.0 * perturb)
+            # positive and negative perturbations are evaluated in one batch,
+            # each row of the broadcast parameters perturbed at one entry
+            params_batch = jnp.broadcast_to(params_ravel, (2 * nbatch, nparam))
+            params_perturb = params_batch.at[
+                np.arange(2 * nbatch), np.tile(idx, 2)
+            ].add(jnp.concatenate([perturb[:, 0], -perturb[:, 0]]))
+            out_perturb = f_vmap(egrid, params_perturb)
+            out_pos_perturb, out_neg_perturb = jnp.split(out_perturb, 2)
+            # the step scale is folded into the tangent before contraction
+            scale = free_params_tangent / (2.0 * perturb[:, 0])
+            tangents_out = scale @ (out_pos_perturb - out_neg_perturb)
         else:
-            perturb = free_params_abs * jnp.sqrt(eps)
-            params_perturb = revert(params_batch + perturb_idx * perturb)
+            params_batch = jnp.broadcast_to(params_ravel, (nbatch, nparam))
+            params_perturb = params_batch.at[np.arange(nbatch), idx].add(
+                perturb[:, 0]
+            )
             out_perturb = f_vmap(egrid, params_perturb)
-            d_out = (out_perturb - primals_out) / perturb
+            # as above, the step is divided out of the tangent, not the output
+            scale = free_params_tangent / perturb[:, 0]
+            tangents_out = scale @ (out_perturb - primals_out)
 
-        free_params_tangent = jnp.array([tvals[i] for i in idx])
-        tangents_out = free_params_tangent @ d_out
         return primals_out, tangents_out
 
     fn = jax.custom_jvp(fn)
@@ -312,24 +350,7 @@ def make_pretty_table(fields: Sequence[str], rows: Sequence) -> PrettyTable:
     table : PrettyTable
         The pretty table.
     """
-    table = PrettyTable(
-        fields,
-        align='c',
-        hrules=1,  # 1 for all, 0 for frame
-        vrules=1,
-        padding_width=1,
-        vertical_char='│',
-        horizontal_char='─',
-        junction_char='┼',
-        top_junction_char='┬',
-        bottom_junction_char='┴',
-        right_junction_char='┤',
-        left_junction_char='├',
-        top_right_junction_char='╮',
-        top_left_junction_char='╭',
-        bottom_right_junction_char='╯',
-        bottom_left_junction_char='╰',
-    )
+    table = PrettyTable(fields, **_PRETTY_TABLE_CONFIG)
     table.add_rows(rows)
     return table
 
@@ -350,11 +371,29 @@ def replace_string(value: T, mapping: dict[str, str]) -> T:
     replaced : iterable or mapping
         Value of `value` replaced with `mapping`.
     """
-    mapping = mapping.items()
+    if not mapping:
+        return value
+
+    mapping = tuple(mapping.items())
+
+    # single-character keys that never appear in replacements can be
+    # replaced in one pass, the result being the same as sequential replace
+    if all(len(k) == 1 for k, _ in mapping) and not any(
+        k in v for k, _ in mapping for _, v in mapping
+    ):
+        table = str.maketrans(dict(mapping))
+
+        def replace_with_mapping(s: str):
+            """Replace all k in s with v, as in mapping."""
+            return s.translate(table)
+
+    else:
 
-    def replace_with_mapping(s: str):
-        """Replace all k in s with v, as in mapping."""
-        return reduce(lambda x, kv: x.replace(*kv), mapping, s)
+        def replace_with_mapping(s: str):
+            """Replace all k in s with v, as in mapping."""
+            for k, v in mapping:
+                s = s.replace(k, v)
+            return s
 
     def replace_dict(d: dict):
         """Replace key and value of a dict."""
@@ -436,7 +475,8 @@ def report_interval(
 
     lower = vmin - vmid
     upper = vmax - vmid
-    exponent = math.log10(abs(vmid))
+    # a zero mid value is reported in fixed-point notation
+    exponent = math.log10(abs(vmid)) if vmid != 0.0 else 0.0
 
     if exponent <= -min_exponent or exponent >= max_exponent:
         str_mid = f'{vmid:.{precision}e}'.split('e')[0]
@@ -513,7 +553,7 @@ def progress_bar_factory(
     else:
         print_rate = 1
 
-    # lock serializes access to idx_counter since callbacks are multithreaded
+    # lock serializes access to bar and idx_counter, callbacks are threaded
     lock = Lock()
     idx_counter = 0  # resource counter
     remainder = neval_single % print_rate
@@ -521,36 +561,51 @@ def progress_bar_factory(
     bar.set_description(init_str, refresh=True)
 
     def _update_tqdm(increment):
-        bar.set_description(run_str, refresh=False)
-        bar.update(int(increment))
+        nonlocal bar
 
-    def _close_tqdm():
-        nonlocal idx_counter
+        with lock:
+            # the kernel is run again after the bar is closed
+            if bar is None:
+                bar = tqdm(range(neval))
 
-        bar.update(remainder)
+            bar.set_description(run_str, refresh=False)
+            bar.update(int(increment))
+
+    def _close_tqdm():
+        nonlocal bar, idx_counter
 
         with lock:
+            bar.update(remainder)
             idx_counter += 1
 
-        if idx_counter == ncores:
-            bar.close()
+            if idx_counter == ncores:
+                bar.close()
+                bar = None
+                idx_counter = 0
+
+    def _update_host(iter_num):
+        iter_num = int(iter_num)
+
+        if iter_num == 1:
+            _update_tqdm(0)
+
+        if iter_num % print_rate == 0:
+            _update_tqdm(print_rate)
+
+        if iter_num == neval_single:
+            _close_tqdm()
+
+    # iterations that fire the host callback, looked up instead of modulo
+    checkpoints = np.zeros(neval_single + 1, dtype=bool)
+    checkpoints[::print_rate] = True
+    checkpoints[[1, neval_single]] = True
+    checkpoints = jnp.asarray(checkpoints)
 
     def _update_progress_bar(iter_num):
+        # one predicate and at most one host callback per iteration
         _ = lax.cond(
-            iter_num == 1,
-            lambda _: io_callback(_update_tqdm, None, 0),
-            lambda _: None,
-            operand=None,
-        )
-        _ = lax.cond(
-            iter_num % print_rate == 0,
-            lambda _: io_callback(_update_tqdm, None, print_rate),
-            lambda _: None,
-            operand=None,
-        )
-        _ = lax.cond(
-            iter_num == neval_single,
-            lambda _: io_callback(_close_tqdm, None),
+            checkpoints[iter_num],
+            lambda _: io_callback(_update_host, None, iter_num),
             lambda _: None,
             operand=None,
         )
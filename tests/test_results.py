@@ -3,6 +3,7 @@ import numpy as np
 import pytest
 
 from elisa.models.add import PowerLaw
+from elisa.plot.data import _quantile
 
 
 def test_mle_result(simulation, mle_result):
@@ -37,6 +38,36 @@ def test_mle_result(simulation, mle_result):
     result.load('mle.pkl.xz', 'lzma')
 
 
+def test_mle_sim_fit_cache(mle_result2):
+    result = mle_result2
+    helper = result._helper
+    params = {k: result.mle[k][0] for k in helper.params_names['free']}
+
+    def sim_fit(seed, n=64, **kwargs):
+        res = helper.simulate_and_fit(
+            seed, params, result._model_values, n, **kwargs
+        )
+        return np.array(list(res['params'].values()))
+
+    # the cached kernel runs again after its progress bar is closed
+    fit1 = sim_fit(1)
+    fit2 = sim_fit(2)
+    assert not np.allclose(fit1, fit2)
+    assert np.array_equal(sim_fit(2), fit2)
+
+    # other setups compile their own kernel
+    assert np.allclose(sim_fit(2, progress=False), fit2)
+    assert np.allclose(sim_fit(2, parallel=False), fit2)
+    assert np.allclose(sim_fit(2, update_rate=10), fit2)
+    assert sim_fit(2, n=32).shape == (2, 32)
+
+    # rerun the bootstrap on the cached kernel with the progress bar
+    result.boot(1000, seed=1)
+    result.boot(1000, seed=2)
+    assert result._boot.seed == 2
+    assert result._boot.n_valid > 0
+
+
 @pytest.mark.parametrize(
     'method, rtol',
     [
@@ -104,6 +135,19 @@ def test_mle_ci_fn(mle_result2, powerlaw_flux):
     assert np.allclose(ci2.errors['fn'], ci3.errors['fn'])
 
 
+def test_mle_ci_boot_rerun(mle_result2):
+    result = mle_result2
+    for n in [1000, 2000]:
+        # the sorted bootstrap samples must follow the rerun of boot
+        result.boot(n)
+        ci = result.ci(cl=0.9, method='boot')
+        assert ci.status['nboot'] == len(ci.status['dist']['PowerLaw.K'])
+        for k, v in result._params_dist.items():
+            q = np.quantile(v, [0.05, 0.95])
+            assert np.allclose(ci.intervals[k], q, rtol=1e-12, atol=0.0)
+            assert np.allclose(ci.status['dist'][k], v)
+
+
 def test_mle_flux(mle_result2, powerlaw_fn, powerlaw_flux):
     result = mle_result2
     result.boot(4000)
@@ -226,6 +270,34 @@ def test_posterior_result(simulation, posterior_result):
     plotter.plot_qq('rq')
 
 
+def test_posterior_pearson_residuals_loo(posterior_result):
+    result = posterior_result
+    for name, data in result.plot.data.items():
+        channel = result._helper.channels[f'{name}_channel']
+        log_weights = result._psislw.sel(channel=channel).values
+        r = data._pearson_residuals('posterior')
+        r_loo = np.sum(np.exp(log_weights.T) * np.abs(r), axis=0)
+        r_loo *= data._get_sign('loo')
+        assert np.allclose(data.residuals('rp'), r_loo)
+
+    plotter = result.plot
+    plotter.residuals = 'rp'
+    plotter()
+    plotter.residuals = 'rq'
+
+
+def test_posterior_ppc_rerun(posterior_result):
+    result = posterior_result
+
+    # rerun the ppc on the cached kernel with the progress bar
+    result.ppc(1000, seed=1)
+    p_value = result.gof
+    result.ppc(1000, seed=2)
+    assert result._ppc.seed == 2
+    assert result._ppc.n_valid > 0
+    assert result.gof != p_value
+
+
 def test_posterior_covar(
     posterior_result, mle_result2_covar, powerlaw_fn, powerlaw_flux
 ):
@@ -319,3 +391,70 @@ def test_posterior_eiso(simulation, posterior_result):
     assert np.allclose(
         ci1.median['simulation'].value, eiso_mle.value, rtol=1e-2, atol=0.0
     )
+
+
+@pytest.mark.parametrize('fit', ['mle_result2', 'posterior_result'])
+def test_plot_data_ci_multi_cl(fit, request):
+    result = request.getfixturevalue(fit)
+    if fit == 'mle_result2':
+        result.boot(1000)
+        get_model = lambda d: d.get_model_boot(d.name)
+    else:
+        result.ppc(1000)
+        get_model = lambda d: d.get_model_posterior(d.name)
+
+    cl = (0.683, 0.954)
+    q = np.array([[0.1585, 0.8415], [0.023, 0.977]])
+    for data in result.plot.data.values():
+        nchan = len(data.channel)
+
+        ci = data.ce_model_ci(cl)
+        ci_true = np.quantile(get_model(data), q, axis=0)
+        assert ci.shape == (2, 2, nchan)
+        assert np.allclose(ci, ci_true)
+        for i, c in enumerate(cl):
+            assert np.allclose(data.ce_model_ci(c), ci[i])
+
+        for rtype in ['rd', 'rp']:
+            r = data.residuals_sim(rtype)
+            ci = data.residuals_ci(rtype, cl, with_sign=True)
+            ci_true = np.quantile(r, q, axis=0)
+            assert ci.shape == (2, 2, nchan)
+            assert np.allclose(ci, ci_true)
+
+            ci = data.residuals_ci(rtype, cl)
+            r_abs = np.quantile(np.abs(r), cl, axis=0)
+            assert ci.shape == (2, 2, nchan)
+            assert np.allclose(ci[:, 0], -r_abs)
+            assert np.allclose(ci[:, 1], r_abs)
+            for i, c in enumerate(cl):
+                assert np.allclose(data.residuals_ci(rtype, c), ci[i])
+
+
+@pytest.mark.parametrize('n', [10, 1009])
+def test_quantile(n):
+    rng = np.random.default_rng(42)
+    x = rng.normal(size=(n, 5))
+    x[n // 2, 1] = np.nan
+    x[:, 3] = np.nan
+    for q in [0.3, [0.1586, 0.5, 0.8413], [[0.05, 0.95], [0.1, 0.9]]]:
+        q_true = np.quantile(x, q, axis=0)
+        for q_test in [_quantile(x, q), _quantile(x.copy(), q, True)]:
+            assert q_test.shape == q_true.shape
+            assert np.allclose(q_test, q_true, equal_nan=True)
+        assert np.allclose(_quantile(x[:, 0], q), np.quantile(x[:, 0], q))
+
+
+def test_quantile_degenerate():
+    q = [0.1586, 0.5, 0.8413]
+    x = np.full((1009, 5), 2.0)
+    x[:, 1] = np.inf
+    x[:, 2] = -1
+    x[500, 3] = np.nan
+    x[0, 4] = np.nan
+    for x_test in [x, x[:, :3], x[:, 2:3], x[:, 2].astype(int)]:
+        with np.errstate(invalid='ignore'):
+            q_test = _quantile(x_test, q)
+            q_true = np.quantile(x_test, q, axis=0)
+        assert q_test.shape == q_true.shape
+        assert np.allclose(q_test, q_true, equal_nan=True)